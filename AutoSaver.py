@@ -0,0 +1,63 @@
+import functools
+import queue
+import threading
+
+_STOP = object()
+
+class AutoSaver:
+    def __init__(self, write, merge=None):
+        """Run write(snapshot) on a background thread so callers never wait on disk.
+
+        Snapshots are handed over through a queue. When several are waiting, only the newest is
+        written; the older ones are already out of date. Partial snapshots (e.g. deltas) can pass
+        merge(older, newer) to combine the waiting ones into one instead.
+        """
+        self.write = write
+        self.merge = merge
+        self.queue = queue.Queue()
+        self.saves = 0
+        self.skipped = 0
+        self.thread = threading.Thread(target=self._run, name="AutoSaver", daemon=True)
+        self.thread.start()
+
+    def submit(self, snapshot):
+        """Queue snapshot for writing and return immediately."""
+        self.queue.put(snapshot)
+
+    def flush(self):
+        """Block until every submitted snapshot has been written or superseded."""
+        self.queue.join()
+
+    def stop(self):
+        """Write whatever is still pending, then stop the writer thread."""
+        self.queue.put(_STOP)
+        self.thread.join()
+
+    def _run(self):
+        stopping = False
+
+        while not stopping:
+            items = [self.queue.get()]
+
+            while True:
+                try:
+                    items.append(self.queue.get_nowait())
+                except queue.Empty:
+                    break
+
+            stopping = any(item is _STOP for item in items)
+            snapshots = [item for item in items if item is not _STOP]
+
+            if snapshots:
+                self.skipped += len(snapshots) - 1
+                self._write(functools.reduce(self.merge, snapshots) if self.merge else snapshots[-1])
+
+            for _ in items:
+                self.queue.task_done()
+
+    def _write(self, snapshot):
+        try:
+            self.write(snapshot)
+            self.saves += 1
+        except Exception as e:
+            print(f"Error saving state: {e}")
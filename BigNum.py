@@ -0,0 +1,150 @@
+import math
+
+FLOAT_LIMIT = 1e300  # values at or above this are promoted to BigNum, leaving headroom before float overflow
+
+class BigNum:
+    __slots__ = ("m", "e")
+
+    def __init__(self, m=0.0, e=0):
+        """A number stored as mantissa * 10 ** exponent, with 1 <= |mantissa| < 10 (or exactly 0).
+
+        Every operation is a handful of float operations, whatever the magnitude, so values far past
+        the float range stay cheap to add, compare and format.
+        """
+        if m == 0:
+            self.m, self.e = 0.0, 0
+            return
+
+        shift = math.floor(math.log10(abs(m)))
+        self.m = m / 10.0 ** shift
+        self.e = e + shift
+
+        # rounding in log10 can leave the mantissa just outside [1, 10)
+        if abs(self.m) >= 10:
+            self.m /= 10
+            self.e += 1
+        elif abs(self.m) < 1:
+            self.m *= 10
+            self.e -= 1
+
+    @staticmethod
+    def of(x):
+        """x as a BigNum (returned unchanged if it already is one)."""
+        return x if isinstance(x, BigNum) else BigNum(float(x))
+
+    @staticmethod
+    def from_log10(log):
+        """The BigNum equal to 10 ** log."""
+        e = math.floor(log)
+        return BigNum(10.0 ** (log - e), e)
+
+    @staticmethod
+    def parse(text):
+        """Inverse of str(): "<mantissa>e<exponent>"."""
+        m, _, e = text.partition("e")
+        return BigNum(float(m), int(e or 0))
+
+    def log10(self):
+        if self.m <= 0: raise ValueError("math domain error")
+        return math.log10(self.m) + self.e
+
+    # --- Arithmetic ---
+
+    def __add__(self, other):
+        other = BigNum.of(other)
+
+        if other.m == 0: return self
+        if self.m == 0: return other
+
+        a, b = (self, other) if self.e >= other.e else (other, self)
+
+        if a.e - b.e > 17:  # b is below a's precision
+            return a
+
+        return BigNum(a.m + b.m * 10.0 ** (b.e - a.e), a.e)
+
+    __radd__ = __add__
+
+    def __neg__(self):
+        n = BigNum()
+        n.m, n.e = -self.m, self.e
+        return n
+
+    def __sub__(self, other): return self + -BigNum.of(other)
+
+    def __rsub__(self, other): return BigNum.of(other) + -self
+
+    def __mul__(self, other):
+        other = BigNum.of(other)
+        return BigNum(self.m * other.m, self.e + other.e)
+
+    __rmul__ = __mul__
+
+    def __truediv__(self, other):
+        other = BigNum.of(other)
+        return BigNum(self.m / other.m, self.e - other.e)
+
+    def __rtruediv__(self, other): return BigNum.of(other) / self
+
+    def __pow__(self, k):
+        if self.m == 0: return BigNum()
+        return BigNum.from_log10(self.log10() * k)
+
+    def __abs__(self): return -self if self.m < 0 else self
+
+    # --- Comparison ---
+
+    def _cmp(self, other):
+        other = BigNum.of(other)
+
+        if self.m == 0 or other.m == 0 or (self.m > 0) != (other.m > 0):
+            return (self.m > other.m) - (self.m < other.m)
+
+        # same sign: a larger exponent means larger magnitude, which is smaller for negatives;
+        # with equal exponents the signed mantissas compare directly
+        c = (self.e > other.e) - (self.e < other.e)
+
+        if c: return c if self.m > 0 else -c
+
+        return (self.m > other.m) - (self.m < other.m)
+
+    def __eq__(self, other): return self._cmp(other) == 0
+    def __lt__(self, other): return self._cmp(other) < 0
+    def __le__(self, other): return self._cmp(other) <= 0
+    def __gt__(self, other): return self._cmp(other) > 0
+    def __ge__(self, other): return self._cmp(other) >= 0
+
+    def __hash__(self):
+        # equal to a float, so hash like one where a float can hold it
+        f = float(self)
+        return hash(f) if math.isfinite(f) else hash((self.m, self.e))
+
+    def __bool__(self): return self.m != 0
+
+    # --- Conversion ---
+
+    def __float__(self):
+        try:
+            return self.m * 10.0 ** self.e
+        except OverflowError:
+            return math.copysign(math.inf, self.m)
+
+    def __str__(self): return f"{self.m!r}e{self.e}"
+
+    def __repr__(self): return f"BigNum({self.m!r}, {self.e})"
+
+    def __format__(self, spec):
+        if not spec: return str(self)
+        return f"{self.m:{spec}}e{self.e}"
+
+def promote(x):
+    """x, switched to a BigNum once it reaches FLOAT_LIMIT."""
+    return BigNum.of(x) if type(x) is not BigNum and x >= FLOAT_LIMIT else x
+
+def to_plain(x):
+    """x in a JSON/SQLite friendly form: numbers as is, BigNums as their string."""
+    return str(x) if isinstance(x, BigNum) else x
+
+def from_plain(x):
+    """Inverse of to_plain()."""
+    return BigNum.parse(x) if isinstance(x, str) else x
@@ -0,0 +1,232 @@
+import argparse
+import json
+import os
+
+CONTENT_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "content.json")
+CATALOGUE_VERSION = 2  # bump when the compiled layout changes, to invalidate old caches
+
+SCALAR_METRICS = ("cups", "money", "total_clicks", "total_upgrades")
+UPGRADE_TYPES = ("click", "producer")
+
+_loaded = {}  # absolute path -> (source key, Catalogue), so one process parses each file once
+
+def unlock_conditions(u):
+    """The (metric, threshold) pairs that must all be reached before upgrade u unlocks."""
+    conds = []
+
+    for key, value in u.get("unlock_at", {}).items():
+        if key == "producer":
+            pid, qty = value
+            conds.append(("qty:" + pid, qty))
+        else:
+            conds.append((key, value))
+
+    return conds
+
+# ========================
+# VALIDATION
+# ========================
+def validate(data):
+    """Check a parsed definitions file. Raises ValueError listing every problem found."""
+    errors = []
+
+    def number(where, value, minimum=0, strict=False):
+        if isinstance(value, bool) or not isinstance(value, (int, float)) or value < minimum or (strict and value == minimum):
+            errors.append(f"{where}: expected a number {'>' if strict else '>='} {minimum}, got {value!r}")
+
+    def metric_ok(metric):
+        return metric in SCALAR_METRICS or (metric.startswith("qty:") and metric[4:] in producers)
+
+    producers = data.get("producers")
+    upgrades = data.get("upgrades")
+    achievements = data.get("achievements", [])
+
+    if not isinstance(producers, dict) or not producers:
+        raise ValueError("Content file needs a non-empty 'producers' object.")
+
+    if not isinstance(upgrades, dict):
+        raise ValueError("Content file needs an 'upgrades' object.")
+
+    for pid, p in producers.items():
+        for key in ("name", "icon"):
+            if not isinstance(p.get(key), str):
+                errors.append(f"producer {pid}: missing {key}")
+
+        number(f"producer {pid}.baseProd", p.get("baseProd"))
+        number(f"producer {pid}.baseCost", p.get("baseCost"), strict=True)
+        number(f"producer {pid}.costMul", p.get("costMul"), minimum=1, strict=True)  # prices must grow
+
+    for uid, u in upgrades.items():
+        for key in ("name", "icon"):
+            if not isinstance(u.get(key), str):
+                errors.append(f"upgrade {uid}: missing {key}")
+
+        if u.get("type") not in UPGRADE_TYPES:
+            errors.append(f"upgrade {uid}: type must be one of {', '.join(UPGRADE_TYPES)}")
+
+        # producer upgrades need a target; any other upgrade that names one must name a real producer
+        if (u.get("type") == "producer" or "target" in u) and not (isinstance(u.get("target"), str) and u["target"] in producers):
+            errors.append(f"upgrade {uid}: unknown target producer {u.get('target')!r}")
+
+        number(f"upgrade {uid}.mult", u.get("mult"), strict=True)
+        number(f"upgrade {uid}.cost", u.get("cost"))
+
+        try:
+            for metric, threshold in unlock_conditions(u):
+                if not metric_ok(metric):
+                    errors.append(f"upgrade {uid}: unknown unlock condition {metric!r}")
+
+                number(f"upgrade {uid} unlock {metric}", threshold)
+        except (AttributeError, TypeError, ValueError):
+            errors.append(f"upgrade {uid}: malformed unlock_at {u.get('unlock_at')!r}")
+
+    names = set()
+
+    for i, a in enumerate(achievements):
+        if not isinstance(a, dict) or not isinstance(a.get("metric"), str) or not isinstance(a.get("name"), str):
+            errors.append(f"achievement #{i}: needs a metric and a name")
+            continue
+
+        if not metric_ok(a["metric"]):
+            errors.append(f"achievement {a['name']}: unknown metric {a['metric']!r}")
+
+        if a["name"] in names:
+            errors.append(f"achievement {a['name']}: duplicate name")
+
+        names.add(a["name"])
+        number(f"achievement {a['name']}.threshold", a.get("threshold"))
+
+    if errors:
+        raise ValueError("Invalid content file:\n  " + "\n  ".join(errors))
+
+# ========================
+# COMPILED CATALOGUE
+# ========================
+class Catalogue:
+    def __init__(self, data):
+        """Validated game content compiled into the lookup structures the engine uses.
+
+        producers/upgrades: {id: definition} in file order, without any progress fields
+        achievements: [(metric, threshold, name)]
+        unlocks: {uid: [(metric, threshold)]}, the conditions of each upgrade
+        thresholds: {metric: sorted [(threshold, uid)]}, every unlock condition grouped by metric,
+            ready to seed GameEngine's unlock index without any heap pushes
+        """
+        self.producers = data["producers"]
+        self.upgrades = data["upgrades"]
+        self.achievements = [(a["metric"], a["threshold"], a["name"]) for a in data.get("achievements", [])]
+
+        self.unlocks = {uid: unlock_conditions(u) for uid, u in self.upgrades.items()}
+        self.thresholds = {}
+
+        for uid, conds in self.unlocks.items():
+            for metric, threshold in conds:
+                self.thresholds.setdefault(metric, []).append((threshold, uid))
+
+        for pairs in self.thresholds.values():
+            pairs.sort()
+
+    def to_compiled(self):
+        """The compiled form as JSON-friendly data, for the cache file."""
+        return {
+            "producers": self.producers,
+            "upgrades": self.upgrades,
+            "achievements": self.achievements,
+            "unlocks": self.unlocks,
+            "thresholds": self.thresholds,
+        }
+
+    @staticmethod
+    def from_compiled(data):
+        """Inverse of to_compiled(): rebuild a Catalogue without validating or compiling again."""
+        catalogue = Catalogue.__new__(Catalogue)
+        catalogue.producers = data["producers"]
+        catalogue.upgrades = data["upgrades"]
+        catalogue.achievements = [tuple(a) for a in data["achievements"]]
+        catalogue.unlocks = {uid: [tuple(c) for c in conds] for uid, conds in data["unlocks"].items()}
+        catalogue.thresholds = {metric: [tuple(p) for p in pairs] for metric, pairs in data["thresholds"].items()}
+        return catalogue
+
+    def new_state(self):
+        """A fresh game state: every definition with its progress fields at their starting values."""
+        return {
+            "cups": 0.0,
+            "money": 0.0,
+            "click_power": 1,
+            "total_clicks": 0,
+            "total_upgrades": 0,
+            "achievements": [],
+            "last_saved": 0.0,
+            "producers": {pid: {**p, "qty": 0, "mult": 1} for pid, p in self.producers.items()},
+            "upgrades": {uid: {**u, "purchased": False, "unlocked": False} for uid, u in self.upgrades.items()},
+        }
+
+# ========================
+# LOADING
+# ========================
+def compile_catalogue(data):
+    """Validate parsed definitions and compile them."""
+    validate(data)
+    return Catalogue(data)
+
+def load_catalogue(path=CONTENT_FILE):
+    """The compiled catalogue for the definitions file at path.
+
+    The compiled form is stored as JSON next to the file (path + ".cache") and reused for as long as
+    the file's size and modification time match, so large content packs are validated and compiled
+    once. The cache is plain data, never code, so a cache shipped alongside a pack cannot run anything.
+    Within a process the result is also kept in memory.
+    """
+    path = os.path.abspath(path)
+    stat = os.stat(path)
+    key = [CATALOGUE_VERSION, stat.st_size, stat.st_mtime_ns]
+
+    loaded = _loaded.get(path)
+
+    if loaded and loaded[0] == key:
+        return loaded[1]
+
+    catalogue = _read_cache(path + ".cache", key)
+
+    if catalogue is None:
+        with open(path, "r", encoding="utf-8") as f:
+            catalogue = compile_catalogue(json.load(f))
+
+        _write_cache(path + ".cache", key, catalogue)
+
+    _loaded[path] = (key, catalogue)
+    return catalogue
+
+def _read_cache(cache_path, key):
+    try:
+        with open(cache_path, "r", encoding="utf-8") as f:
+            cached = json.load(f)
+
+        if cached["key"] != key: return None
+
+        return Catalogue.from_compiled(cached)
+    except (OSError, ValueError, KeyError, TypeError, AttributeError):
+        return None
+
+def _write_cache(cache_path, key, catalogue):
+    # best effort: a read-only install just parses the file on every start
+    tmp = cache_path + ".tmp"
+
+    try:
+        with open(tmp, "w", encoding="utf-8") as f:
+            json.dump({"key": key, **catalogue.to_compiled()}, f, separators=(",", ":"))
+
+        os.replace(tmp, cache_path)
+    except OSError:
+        pass
+
+# ========================
+# COMMAND LINE
+# ========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Validate and compile a Coffee Empire content file.")
+    parser.add_argument("path", nargs="?", default=CONTENT_FILE)
+    args = parser.parse_args()
+
+    catalogue = load_catalogue(args.path)
+    print(f"{len(catalogue.producers)} producers, {len(catalogue.upgrades)} upgrades, {len(catalogue.achievements)} achievements")
@@ -1,51 +1,199 @@
+import json
 import sqlite3
+import time
+from collections import deque
+from contextlib import contextmanager
+
+COLUMNS = ["cups", "money", "click_power", "total_clicks", "total_upgrades", "achievements", "producers", "upgrades", "last_saved", "name", "big"]
+DEFAULTS = {"cups": 0.0, "money": 0.0, "click_power": 1, "total_clicks": 0, "total_upgrades": 0, "achievements": "", "producers": "{}", "upgrades": "{}", "last_saved": 0.0, "name": None, "big": None}
+RANKABLE = ["cups", "money", "total_clicks", "last_saved"]  # indexed columns for leaderboards and paging
+DEFAULT_SLOT = "default"
 
 class DatabaseManager:
-    def __init__(self, db_name="coffee.db"):
-        """Initialize the database connection and create a table if not exists."""
-        self.conn = sqlite3.connect(db_name)
+    def __init__(self, db_name="coffee.db", check_same_thread=True, wal=False):
+        """Initialize the database connection and create a table if not exists.
+
+        Pass check_same_thread=False to hand the connection to another thread, e.g. a background saver.
+        Pass wal=True for frequent saves: write-ahead journaling with synchronous=NORMAL only syncs at
+        checkpoints, which keeps commits fast while staying safe against application crashes.
+        """
+        self.conn = sqlite3.connect(db_name, check_same_thread=check_same_thread)
         self.cursor = self.conn.cursor()
+        self.depth = 0  # nesting level of transaction() blocks
+        self.commit_times = deque(maxlen=256)  # recent commit latencies in seconds
+        self.written = {}  # (table, save_id, item_id) -> values last committed/read, for delta saves
+        self.unwritten = {}  # the same for rows written but not committed yet; merged into written on commit
+
+        if wal:
+            self.cursor.execute("PRAGMA journal_mode=WAL")
+            self.cursor.execute("PRAGMA synchronous=NORMAL")
+
         self._create_table()
 
     def _create_table(self):
-        """Create game_state table if it doesn't exist."""
-        self.cursor.execute('''
-            CREATE TABLE IF NOT EXISTS game_state (
-                id INTEGER PRIMARY KEY AUTOINCREMENT,
-                cups REAL NOT NULL,
-                money REAL NOT NULL,
-                click_power INTEGER NOT NULL,
-                total_clicks INTEGER NOT NULL,
-                total_upgrades INTEGER NOT NULL,
-                achievements TEXT DEFAULT '',
-                producers TEXT DEFAULT '{}',
-                upgrades TEXT DEFAULT '{}'
-            )
-        ''')
-        self.conn.commit()
+        """Create the game_state, producer_state and upgrade_state tables if they don't exist."""
+        with self.transaction():
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS game_state (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    cups REAL NOT NULL,
+                    money REAL NOT NULL,
+                    click_power INTEGER NOT NULL,
+                    total_clicks INTEGER NOT NULL,
+                    total_upgrades INTEGER NOT NULL,
+                    achievements TEXT DEFAULT '',
+                    producers TEXT DEFAULT '{}',
+                    upgrades TEXT DEFAULT '{}',
+                    last_saved REAL DEFAULT 0,
+                    name TEXT,
+                    big TEXT
+                )
+            ''')
+            # only the mutable progress of each producer/upgrade is stored; definitions live in code
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS producer_state (
+                    save_id INTEGER NOT NULL,
+                    producer_id TEXT NOT NULL,
+                    qty INTEGER NOT NULL,
+                    mult REAL NOT NULL,
+                    PRIMARY KEY (save_id, producer_id)
+                ) WITHOUT ROWID
+            ''')
+            self.cursor.execute('''
+                CREATE TABLE IF NOT EXISTS upgrade_state (
+                    save_id INTEGER NOT NULL,
+                    upgrade_id TEXT NOT NULL,
+                    purchased INTEGER NOT NULL,
+                    unlocked INTEGER NOT NULL,
+                    PRIMARY KEY (save_id, upgrade_id)
+                ) WITHOUT ROWID
+            ''')
+            self._migrate()
+
+    def _migrate(self):
+        """Bring tables created by older versions up to the current schema."""
+        columns = [row[1] for row in self.cursor.execute("PRAGMA table_info(game_state)")]
+
+        if "last_saved" not in columns:
+            self.cursor.execute("ALTER TABLE game_state ADD COLUMN last_saved REAL DEFAULT 0")
+
+        if "name" not in columns:
+            self.cursor.execute("ALTER TABLE game_state ADD COLUMN name TEXT")
+            # id 1 is the save older versions always used
+            self.cursor.execute(f"UPDATE game_state SET name = CASE id WHEN 1 THEN '{DEFAULT_SLOT}' ELSE 'slot-' || id END")
+
+        # exact values of cups/money past the float range; the REAL columns hold them clamped
+        if "big" not in columns:
+            self.cursor.execute("ALTER TABLE game_state ADD COLUMN big TEXT")
+
+        self.cursor.execute("CREATE UNIQUE INDEX IF NOT EXISTS game_state_name ON game_state (name)")
+
+        for column in RANKABLE:
+            self.cursor.execute(f"CREATE INDEX IF NOT EXISTS game_state_{column} ON game_state ({column}, id)")
+
+        # move producers/upgrades out of the old JSON blob columns into the normalized tables
+        legacy = self.conn.execute("SELECT id, producers, upgrades FROM game_state WHERE producers != '{}' OR upgrades != '{}'").fetchall()
+
+        for id, producers, upgrades in legacy:
+            try:
+                producers = json.loads(producers or "{}")
+                upgrades = json.loads(upgrades or "{}")
+            except json.JSONDecodeError:
+                continue
+
+            self.upsert_producers(id, {pid: (p.get("qty", 0), p.get("mult", 1)) for pid, p in producers.items()})
+            self.upsert_upgrades(id, {uid: (u.get("purchased", False), u.get("unlocked", False)) for uid, u in upgrades.items()})
+            self.cursor.execute("UPDATE game_state SET producers='{}', upgrades='{}' WHERE id=?", (id,))
+
+    # --- Transactions ---
+
+    @contextmanager
+    def transaction(self):
+        """Group several writes into one commit. Nested blocks join the outermost one."""
+        self.depth += 1
+
+        try:
+            yield self
+        except BaseException:
+            self.depth -= 1
+
+            if self.depth == 0:
+                self.conn.rollback()
+                self.unwritten.clear()  # rolled back rows must be written again next time
+
+            raise
+        else:
+            self.depth -= 1
+            self._commit()
+
+    def _commit(self):
+        """Commit unless inside transaction(), recording how long the commit took."""
+        if self.depth: return
+
+        start = time.perf_counter()
+
+        try:
+            self.conn.commit()
+        except BaseException:
+            self.unwritten.clear()
+            raise
+
+        self.commit_times.append(time.perf_counter() - start)
+        self.written.update(self.unwritten)
+        self.unwritten.clear()
+
+    def commit_stats(self):
+        """Latency of recent commits in milliseconds."""
+        times = sorted(self.commit_times)
+
+        if not times:
+            return {"count": 0, "last_ms": 0.0, "mean_ms": 0.0, "p95_ms": 0.0, "max_ms": 0.0}
+
+        return {
+            "count": len(times),
+            "last_ms": self.commit_times[-1] * 1000,
+            "mean_ms": sum(times) / len(times) * 1000,
+            "p95_ms": times[min(len(times) - 1, int(len(times) * 0.95))] * 1000,
+            "max_ms": times[-1] * 1000,
+        }
 
     # --- CRUD Operations ---
 
     def create(self, data: dict):
         """Insert a new game state."""
-        self.cursor.execute('''
-                INSERT INTO game_state (cups, money, click_power, total_clicks, total_upgrades, achievements, producers, upgrades)
-                VALUES (?, ?, ?, ?, ?, ?, ?, ?)
+        self.cursor.execute(f'''
+                INSERT INTO game_state ({", ".join(COLUMNS)})
+                VALUES ({", ".join("?" * len(COLUMNS))})
             ''',
-            (
-                data.get("cups", 0.0),
-                data.get("money", 0.0),
-                data.get("click_power", 1),
-                data.get("total_clicks", 0),
-                data.get("total_upgrades", 0),
-                data.get("achievements", ""),
-                data.get("producers", "{}"),
-                data.get("upgrades", "{}")
-            )
+            tuple(data.get(key, DEFAULTS[key]) for key in COLUMNS)
         )
-        self.conn.commit()
+        self._commit()
         return self.cursor.lastrowid
 
+    def create_many(self, rows):
+        """Insert many game states with a single prepared statement and one commit."""
+        self.cursor.executemany(
+            f"INSERT INTO game_state ({', '.join(COLUMNS)}) VALUES ({', '.join('?' * len(COLUMNS))})",
+            (tuple(data.get(key, DEFAULTS[key]) for key in COLUMNS) for data in rows)
+        )
+        self._commit()
+
+    def save(self, data: dict):
+        """Insert game state data["id"] or overwrite the fields given in data, in one statement without reading it first."""
+        id = data.get("id")
+        if not id:
+            raise ValueError("ID is required for save operation.")
+
+        # a new row gets defaults for missing fields; an existing row keeps them
+        updates = [key for key in COLUMNS if key in data] or ["id"]
+        self.cursor.execute(
+            f"INSERT INTO game_state (id, {', '.join(COLUMNS)}) VALUES (?, {', '.join('?' * len(COLUMNS))}) "
+            f"ON CONFLICT(id) DO UPDATE SET {', '.join(f'{key}=excluded.{key}' for key in updates)}",
+            (id, *(data.get(key, DEFAULTS[key]) for key in COLUMNS))
+        )
+        self._commit()
+        return id
+
     def read(self, id=None):
         """Fetch all game states or a specific game state by id."""
         if id:
@@ -55,6 +203,56 @@ class DatabaseManager:
             self.cursor.execute("SELECT * FROM game_state")
             return self.cursor.fetchall()
         
+    def iter_saves(self, order_by="id", descending=False, page_size=500):
+        """Yield every game state row in order, one page at a time, so memory stays bounded.
+
+        Pages are fetched by keyset (WHERE (order_by, id) > last seen) rather than OFFSET, so each
+        page costs the same no matter how deep into the table it is.
+        """
+        if order_by != "id" and order_by not in RANKABLE:
+            raise ValueError(f"Cannot order saves by {order_by!r}.")
+
+        direction, op = ("DESC", "<") if descending else ("ASC", ">")
+        order = f"id {direction}" if order_by == "id" else f"{order_by} {direction}, id {direction}"
+        last = None
+
+        while True:
+            if last is None:
+                rows = self.conn.execute(f"SELECT * FROM game_state ORDER BY {order} LIMIT ?", (page_size,)).fetchall()
+            elif order_by == "id":
+                rows = self.conn.execute(f"SELECT * FROM game_state WHERE id {op} ? ORDER BY {order} LIMIT ?", (last[0], page_size)).fetchall()
+            else:
+                rows = self.conn.execute(
+                    f"SELECT * FROM game_state WHERE ({order_by}, id) {op} (?, ?) ORDER BY {order} LIMIT ?",
+                    (last[COLUMNS.index(order_by) + 1], last[0], page_size)
+                ).fetchall()
+
+            yield from rows
+
+            if len(rows) < page_size: return
+
+            last = rows[-1]
+
+    def top_saves(self, column="money", n=10):
+        """The n game states with the highest value of column, best first."""
+        if column not in RANKABLE:
+            raise ValueError(f"Cannot rank saves by {column!r}.")
+
+        return self.conn.execute(f"SELECT * FROM game_state ORDER BY {column} DESC, id DESC LIMIT ?", (n,)).fetchall()
+
+    def recent_saves(self, n=10):
+        """The n most recently saved game states, newest first."""
+        return self.top_saves("last_saved", n)
+
+    def find_slot(self, name):
+        """Id of the save slot called name, or None."""
+        row = self.conn.execute("SELECT id FROM game_state WHERE name=?", (name,)).fetchone()
+        return row[0] if row else None
+
+    def open_slot(self, name):
+        """Id of the save slot called name, creating an empty one if needed."""
+        return self.find_slot(name) or self.create({"name": name})
+
     def update(self, data: dict):
         """Update game state details by id."""
         id = data.get("id")
@@ -64,7 +262,7 @@ class DatabaseManager:
         fields = []
         values = []
 
-        for key in ["cups", "money", "click_power", "total_clicks", "total_upgrades", "achievements", "producers", "upgrades"]:
+        for key in COLUMNS:
             if key in data:
                 fields.append(f"{key}=?")
                 values.append(data[key])
@@ -75,40 +273,122 @@ class DatabaseManager:
         values.append(id)
         sql = f"UPDATE game_state SET {', '.join(fields)} WHERE id=?"
         self.cursor.execute(sql, tuple(values))
-        self.conn.commit()
+        self._commit()
 
-    def updateBak(self, id, cups=None, money=None, click_power=None, total_clicks=None, total_upgrades=None, achievements=None, producers=None, upgrades=None):
-        """Update game state details by id."""
-        if cups is not None:
-            self.cursor.execute("UPDATE game_state SET cups=? WHERE id=?", (cups, id))
+    def update_many(self, rows):
+        """Update many game states in one commit. Rows with the same set of keys share a prepared statement."""
+        groups = {}
 
-        if money is not None:
-            self.cursor.execute("UPDATE game_state SET money=? WHERE id=?", (money, id))
+        for data in rows:
+            if not data.get("id"):
+                raise ValueError("ID is required for update operation.")
 
-        if click_power is not None:
-            self.cursor.execute("UPDATE game_state SET click_power=? WHERE id=?", (click_power, id))
+            keys = tuple(key for key in COLUMNS if key in data)
 
-        if total_clicks is not None:
-            self.cursor.execute("UPDATE game_state SET total_clicks=? WHERE id=?", (total_clicks, id))
+            if not keys:
+                raise ValueError("No fields to update.")
 
-        if total_upgrades is not None:
-            self.cursor.execute("UPDATE game_state SET total_upgrades=? WHERE id=?", (total_upgrades, id))
+            groups.setdefault(keys, []).append(tuple(data[key] for key in keys) + (data["id"],))
 
-        if achievements is not None:
-            self.cursor.execute("UPDATE game_state SET achievements=? WHERE id=?", (achievements, id))
+        with self.transaction():
+            for keys, values in groups.items():
+                self.cursor.executemany(f"UPDATE game_state SET {', '.join(f'{key}=?' for key in keys)} WHERE id=?", values)
 
-        if producers is not None:
-            self.cursor.execute("UPDATE game_state SET producers=? WHERE id=?", (producers, id))
+    def updateBak(self, id, cups=None, money=None, click_power=None, total_clicks=None, total_upgrades=None, achievements=None, producers=None, upgrades=None):
+        """Update game state details by id. Legacy keyword form of update(), kept for old callers."""
+        data = {"id": id}
 
-        if upgrades is not None:
-            self.cursor.execute("UPDATE game_state SET upgrades=? WHERE id=?", (upgrades, id))
+        for key, value in zip(COLUMNS, (cups, money, click_power, total_clicks, total_upgrades, achievements, producers, upgrades)):
+            if value is not None:
+                data[key] = value
 
-        self.conn.commit()
+        if len(data) > 1:
+            self.update(data)
 
     def delete(self, id):
         """Delete a game state by id."""
-        self.cursor.execute("DELETE FROM game_state WHERE id=?", (id,))
-        self.conn.commit()
+        with self.transaction():
+            self.cursor.execute("DELETE FROM game_state WHERE id=?", (id,))
+            self.cursor.execute("DELETE FROM producer_state WHERE save_id=?", (id,))
+            self.cursor.execute("DELETE FROM upgrade_state WHERE save_id=?", (id,))
+
+        self.written = {key: value for key, value in self.written.items() if key[1] != id}
+
+    # --- Producer/upgrade progress ---
+
+    def _changed(self, table, save_id, rows):
+        """Keep only rows whose values differ from what this connection last wrote or read.
+
+        The values are only recorded as written once the enclosing commit succeeds.
+        """
+        changed = []
+
+        for item_id, values in rows.items():
+            key = (table, save_id, item_id)
+            values = tuple(values)
+            last = self.unwritten[key] if key in self.unwritten else self.written.get(key)
+
+            if last != values:
+                self.unwritten[key] = values
+                changed.append((save_id, item_id, *values))
+
+        return changed
+
+    def upsert_producers(self, save_id, rows):
+        """Write {producer_id: (qty, mult)}, skipping rows unchanged since the last write. Returns rows written."""
+        with self.transaction():
+            changed = self._changed("producer_state", save_id, rows)
+
+            if changed:
+                self.cursor.executemany(
+                    "INSERT INTO producer_state (save_id, producer_id, qty, mult) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(save_id, producer_id) DO UPDATE SET qty=excluded.qty, mult=excluded.mult",
+                    changed
+                )
+
+        return len(changed)
+
+    def upsert_upgrades(self, save_id, rows):
+        """Write {upgrade_id: (purchased, unlocked)}, skipping rows unchanged since the last write. Returns rows written."""
+        rows = {uid: (int(purchased), int(unlocked)) for uid, (purchased, unlocked) in rows.items()}
+        with self.transaction():
+            changed = self._changed("upgrade_state", save_id, rows)
+
+            if changed:
+                self.cursor.executemany(
+                    "INSERT INTO upgrade_state (save_id, upgrade_id, purchased, unlocked) VALUES (?, ?, ?, ?) "
+                    "ON CONFLICT(save_id, upgrade_id) DO UPDATE SET purchased=excluded.purchased, unlocked=excluded.unlocked",
+                    changed
+                )
+
+        return len(changed)
+
+    def read_producers(self, save_id):
+        """Fetch {producer_id: (qty, mult)} for a save."""
+        rows = {}
+
+        for producer_id, qty, mult in self.conn.execute("SELECT producer_id, qty, mult FROM producer_state WHERE save_id=?", (save_id,)):
+            rows[producer_id] = (qty, mult)
+            self.written[("producer_state", save_id, producer_id)] = (qty, mult)
+
+        return rows
+
+    def read_upgrades(self, save_id):
+        """Fetch {upgrade_id: (purchased, unlocked)} for a save."""
+        rows = {}
+
+        for upgrade_id, purchased, unlocked in self.conn.execute("SELECT upgrade_id, purchased, unlocked FROM upgrade_state WHERE save_id=?", (save_id,)):
+            rows[upgrade_id] = (bool(purchased), bool(unlocked))
+            self.written[("upgrade_state", save_id, upgrade_id)] = (purchased, unlocked)
+
+        return rows
+
+    def save_game(self, data: dict, producers, upgrades):
+        """Save a game state row plus its changed producer/upgrade rows in one transaction."""
+        with self.transaction():
+            self.save(data)
+            self.upsert_producers(data["id"], producers)
+            self.upsert_upgrades(data["id"], upgrades)
 
     def __del__(self):
         """Close the connection when the object is destroyed."""
@@ -126,19 +406,24 @@ if __name__ == "__main__":
         "total_clicks": 100,
         "total_upgrades": 5,
         "achievements": "First Brew, Bean Tycoon",
-        "producers": '{"barista": {"name": "Hire Barista", "baseProd": 1, "baseCost": 2, "costMul": 1.15, "qty": 3, "mult": 1, "icon": "barista.png"}, "machine": {"name": "Buy Coffee Machine", "baseProd": 5, "baseCost": 100, "costMul": 1.15, "qty": 3, "mult": 1, "icon": "machine.png"}, "shop": {"name": "Open Coffee Shop", "baseProd": 20, "baseCost": 400, "costMul": 1.15, "qty": 1, "mult": 1, "icon": "shop.png"}, "farmer": {"name": "Hire Coffee Farmer", "baseProd": 100, "baseCost": 2000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"}, "factory": {"name": "Build Coffee Factory", "baseProd": 500, "baseCost": 20000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"}, "franchise": {"name": "Start Global Franchise", "baseProd": 5000, "baseCost": 200000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"}}',
-        "upgrades": '{"stronger_hands": {"type": "click", "name": "Stronger Hands", "mult": 2, "cost": 200, "purchased": True, "unlock_at": {"money": 20}, "icon": "hands.png"}, "turbo_brewing": {"type": "click", "name": "Turbo Brewing", "mult": 3, "cost": 1000, "purchased": True, "unlock_at": {"money": 100}, "icon": "turbo.png"}, "better_beans": {"type": "producer", "name": "Better Beans", "target": "barista", "mult": 2, "cost": 500, "purchased": False, "unlock_at": {"producer": ["barista", 5]}, "icon": "beans.png"}, "cold_brew": {"type": "producer", "name": "Cold Brew", "target": "barista", "mult": 2.5, "cost": 10000, "purchased": False, "unlock_at": {"producer": ["barista", 75]}, "icon": "beans.png"}}'
+        "name": "example",
     }
 
     game_state_id = db.create(data)
     print(f"New game state ID: {game_state_id}")
 
+    # Producer/upgrade progress lives in its own tables
+    db.upsert_producers(game_state_id, {"barista": (3, 1), "machine": (3, 1), "shop": (1, 1)})
+    db.upsert_upgrades(game_state_id, {"stronger_hands": (True, True), "turbo_brewing": (True, True)})
+
     # Read
     game_state = db.read(game_state_id)
     print("Game state:", game_state)
+    print("Producers:", db.read_producers(game_state_id))
+    print("Upgrades:", db.read_upgrades(game_state_id))
 
     # Update
-    db.update(game_state_id, cups=15.0, money=75.0)
+    db.update({"id": game_state_id, "cups": 15.0, "money": 75.0})
     print("Updated game state:", db.read(game_state_id))
 
     # Delete
@@ -0,0 +1,421 @@
+import heapq
+import itertools
+import math
+import threading
+import time
+
+from BigNum import BigNum, FLOAT_LIMIT, promote, to_plain, from_plain
+from Catalogue import load_catalogue, unlock_conditions
+
+TICK_SECONDS = 0.1
+BUY_MAX = "max"
+EXACT_INT = 2 ** 53  # prices are kept as exact ints below this
+
+# ========================
+# CONTENT
+# ========================
+# producers, upgrades and achievements are defined in content.json (see Catalogue.py)
+CATALOGUE = load_catalogue()  # default for GameEngine(); each engine builds its own state from it
+
+def _unit_cost(p):
+    """baseCost * costMul ** qty, as a float while it fits and as a BigNum beyond FLOAT_LIMIT."""
+    try:
+        first = p["baseCost"] * (p["costMul"] ** p["qty"])
+    except OverflowError:
+        first = math.inf
+
+    if first < FLOAT_LIMIT: return first
+
+    return BigNum.of(p["baseCost"]) * BigNum.of(p["costMul"]) ** p["qty"]
+
+def _spent(p, k):
+    """Unrounded price of a producer's first k units: baseCost * (costMul ** k - 1) / (costMul - 1)."""
+    r = p["costMul"]
+
+    try:
+        return p["baseCost"] * k if r == 1 else p["baseCost"] * (r ** k - 1) / (r - 1)
+    except OverflowError:
+        return math.inf
+
+def get_cost(p): return get_bulk_cost(p, 1)
+
+def get_bulk_cost(p, n):
+    """Total price of the next n units, summed in closed form as a geometric series.
+
+    While prices are exact in a float, the total is the difference between the whole-number totals
+    spent before and after the purchase. Every price is then a whole number, and n single
+    purchases cost exactly what one purchase of n does.
+    """
+    if n <= 0: return 0
+
+    end = _spent(p, p["qty"] + n)
+
+    if end < EXACT_INT: return int(end) - int(_spent(p, p["qty"]))
+
+    r = p["costMul"]
+    first = _unit_cost(p)
+
+    if r == 1: return promote(first * n)
+
+    try:
+        total = first * (r ** n - 1) / (r - 1)
+    except OverflowError:
+        total = math.inf
+
+    if total >= FLOAT_LIMIT:
+        total = BigNum.of(first) * (BigNum.of(r) ** n - 1) / (r - 1)
+
+    return total
+
+def get_max_affordable(p, money):
+    """Largest n such that get_bulk_cost(p, n) <= money, solved from the geometric series."""
+    r = p["costMul"]
+    first = _unit_cost(p)
+
+    if money < get_cost(p): return 0
+
+    if r == 1:
+        # flat prices (only possible for producers added outside the catalogue, which requires
+        # costMul > 1): past EXACT_INT units quantities lose precision, so buy at most that many
+        n = int(min(float(money / first), EXACT_INT))
+    elif type(money) is float and type(first) is float:
+        n = int(math.log(money * (r - 1) / first + 1, r))
+    else:
+        n = int((BigNum.of(money) * (r - 1) / first + 1).log10() / math.log10(r))
+
+    # the logarithm can land one off either side of an exact boundary
+    if get_bulk_cost(p, n) > money:
+        n -= 1
+    elif get_bulk_cost(p, n + 1) <= money:
+        n += 1
+
+    return n
+
+# ========================
+# THRESHOLD INDEX
+# ========================
+class ThresholdIndex:
+    def __init__(self):
+        """Per-metric min-heaps of (threshold, item). Only the lowest unmet threshold of a metric is ever compared."""
+        self.heaps = {}
+        self._seq = itertools.count()  # tie-breaker so items themselves are never compared
+
+    def add(self, metric, threshold, item):
+        heapq.heappush(self.heaps.setdefault(metric, []), (threshold, next(self._seq), item))
+
+    def seed(self, metric, pairs):
+        """Start metric's heap from (threshold, item) pairs already sorted by threshold; a sorted list is a valid heap."""
+        self.heaps[metric] = [(threshold, next(self._seq), item) for threshold, item in pairs]
+
+    def next_threshold(self, metric):
+        """The lowest threshold still pending for metric, or None."""
+        heap = self.heaps.get(metric)
+        return heap[0][0] if heap else None
+
+    def crossed(self, metric, value):
+        """Pop and return the items whose threshold for metric is <= value."""
+        heap = self.heaps.get(metric)
+
+        if not heap or value < heap[0][0]: return []
+
+        items = []
+
+        while heap and heap[0][0] <= value:
+            items.append(heapq.heappop(heap)[2])
+
+        return items
+
+# ========================
+# ENGINE
+# ========================
+class GameEngine:
+    def __init__(self, state=None, columnar=False, catalogue=None):
+        """Own the game state and apply the game rules to it, without any UI.
+
+        catalogue is the compiled content (see Catalogue.py) the state was built from; it defaults to
+        the built-in content.json.
+
+        With columnar=True the producers are kept in a ProducerTable (NumPy columns when available)
+        behind the same dict-style interface, for catalogues with thousands of producers.
+        """
+        self.catalogue = catalogue or CATALOGUE
+        self.state = state if state is not None else self.catalogue.new_state()
+        self.columnar = columnar
+
+        if columnar:
+            from ProducerTable import ProducerTable
+            self.state["producers"] = ProducerTable(self.state["producers"])
+
+        self.listeners = []
+        self.elapsed = 0.0  # simulated seconds advanced by tick() since this engine was created
+        self.rates = {}  # cups/sec per producer
+        self.production = 0.0  # cups/sec in total
+        self.changed_producers = set()  # ids changed since the last progress(changed_only=True)
+        self.changed_upgrades = set()
+        self.changed_lock = threading.Lock()  # mark_changed() may run on a saver thread
+        self.rebuild()
+
+    def add_listener(self, callback):
+        """Register callback(event, *args) for engine events:
+
+        ("tick", dt), ("click", gain, count), ("producer", pid, n), ("upgrade", uid), ("unlock", uid),
+        ("achievement", name)
+        """
+        self.listeners.append(callback)
+
+    def rebuild(self):
+        """Recompute every cache derived from state. Call after replacing state contents, e.g. on load."""
+        producers = self.state["producers"]
+
+        if self.columnar:
+            self.rates = dict(zip(producers.ids, map(float, producers.rates())))
+            self.production = producers.production()
+        else:
+            self.rates = {pid: p["qty"] * p["baseProd"] * p["mult"] for pid, p in producers.items()}
+            self.production = sum(self.rates.values())
+
+        self.achievements = set(self.state["achievements"])
+        self.achievement_index = ThresholdIndex()
+
+        for metric, threshold, name in self.catalogue.achievements:
+            if name not in self.achievements:
+                self.achievement_index.add(metric, threshold, name)
+
+        # unlocks are sticky: once every condition of an upgrade has been reached it stays unlocked
+        self.unlocked = set()
+        self.unlock_index = ThresholdIndex()
+        self._unmet = {}  # uid -> number of unlock conditions not reached yet
+        compiled = self.catalogue.unlocks
+        extra = []  # conditions of upgrades added to the state outside the catalogue
+
+        for uid, u in self.state["upgrades"].items():
+            conds = compiled[uid] if uid in compiled else unlock_conditions(u)
+
+            if u.get("unlocked") or u["purchased"] or not conds:
+                self._unlock(uid)
+                continue
+
+            self._unmet[uid] = len(conds)
+
+            if uid not in compiled:
+                extra.extend((metric, threshold, uid) for metric, threshold in conds)
+
+        # catalogue conditions come pre-sorted per metric, so the heaps are built without pushes
+        for metric, pairs in self.catalogue.thresholds.items():
+            self.unlock_index.seed(metric, [(threshold, uid) for threshold, uid in pairs if uid in self._unmet])
+
+        for metric, threshold, uid in extra:
+            self.unlock_index.add(metric, threshold, uid)
+
+        # pick up thresholds the loaded state has already reached
+        for metric in set(self.achievement_index.heaps) | set(self.unlock_index.heaps):
+            self._metric_changed(metric, self.metric_value(metric))
+
+    def _update_rate(self, pid):
+        p = self.state["producers"][pid]
+        rate = p["qty"] * p["baseProd"] * p["mult"]
+        self.production += rate - self.rates.get(pid, 0)
+        self.rates[pid] = rate
+
+    def _emit(self, event, *args):
+        for callback in self.listeners:
+            callback(event, *args)
+
+    # --- Queries ---
+
+    def metric_value(self, metric):
+        """Current value of an achievement metric."""
+        if metric.startswith("qty:"):
+            return self.state["producers"][metric[4:]]["qty"]
+
+        return self.state[metric]
+
+    def get_total_production(self):
+        """Cups per second produced by all producers."""
+        return self.production
+
+    def progress(self, changed_only=False):
+        """The mutable part of the state as plain JSON-friendly data, without any static definitions.
+
+        Cheap enough to take on the game thread and hand to a background saver. With changed_only=True,
+        producers/upgrades hold only the ids changed since the previous such call, so delta saves cost
+        what changed rather than the size of the catalogue.
+        """
+        state = self.state
+        producers, upgrades = state["producers"], state["upgrades"]
+
+        if changed_only:
+            with self.changed_lock:
+                pids, self.changed_producers = self.changed_producers, set()
+                uids, self.changed_upgrades = self.changed_upgrades, set()
+        else:
+            pids, uids = producers, upgrades
+
+        return {
+            "cups": to_plain(state["cups"]),
+            "money": to_plain(state["money"]),
+            "click_power": state["click_power"],
+            "total_clicks": state["total_clicks"],
+            "total_upgrades": state["total_upgrades"],
+            "achievements": list(state["achievements"]),
+            "last_saved": state["last_saved"],
+            "producers": {pid: [producers[pid]["qty"], producers[pid]["mult"]] for pid in pids},
+            "upgrades": {uid: [upgrades[uid]["purchased"], upgrades[uid].get("unlocked", False)] for uid in uids},
+        }
+
+    def restore(self, progress):
+        """Merge progress() data onto the current definitions and rebuild caches. Unknown ids are ignored."""
+        state = self.state
+
+        for key in ("cups", "money", "click_power", "total_clicks", "total_upgrades", "last_saved"):
+            if key in progress:
+                state[key] = from_plain(progress[key])
+
+        state["achievements"] = list(progress.get("achievements", []))
+
+        for pid, (qty, mult) in progress.get("producers", {}).items():
+            if pid in state["producers"]:
+                state["producers"][pid].update(qty=qty, mult=mult)
+
+        for uid, (purchased, unlocked) in progress.get("upgrades", {}).items():
+            if uid in state["upgrades"]:
+                state["upgrades"][uid].update(purchased=purchased, unlocked=unlocked)
+
+        self.mark_changed(state["producers"], state["upgrades"])
+        self.rebuild()
+
+    def mark_changed(self, producers=(), upgrades=()):
+        """Include these producer/upgrade ids in the next progress(changed_only=True), e.g. after a failed save.
+
+        Safe to call from another thread than the one taking progress().
+        """
+        with self.changed_lock:
+            self.changed_producers.update(producers)
+            self.changed_upgrades.update(upgrades)
+
+    def is_unlocked(self, uid):
+        """Whether upgrade uid has been unlocked."""
+        return uid in self.unlocked
+
+    # --- Actions ---
+
+    def click(self, count=1):
+        """Apply count brew clicks as one batch. Returns the amount gained."""
+        if count <= 0: return 0
+
+        state = self.state
+        gain = state["click_power"] * count
+        state["cups"] = promote(state["cups"] + gain)
+        state["money"] = promote(state["money"] + gain)
+        state["total_clicks"] += count
+
+        self._emit("click", gain, count)
+        self._metric_changed("total_clicks", state["total_clicks"])
+        self._metric_changed("cups", state["cups"])
+        self._metric_changed("money", state["money"])
+        return gain
+
+    def get_buy_amount(self, pid, amount=1):
+        """Resolve amount (a count or BUY_MAX) to the number of units a purchase of pid would buy."""
+        if amount == BUY_MAX:
+            return get_max_affordable(self.state["producers"][pid], self.state["money"])
+
+        return amount
+
+    def buy_producer(self, pid, amount=1):
+        """Buy amount units (or BUY_MAX) of producer pid if affordable. Returns the number bought."""
+        p = self.state["producers"][pid]
+        n = self.get_buy_amount(pid, amount)
+        cost = get_bulk_cost(p, n)
+
+        if n <= 0 or self.state["money"] < cost: return 0
+
+        self.state["money"] -= cost
+        p["qty"] += n
+        self.changed_producers.add(pid)
+        self._update_rate(pid)
+
+        self._emit("producer", pid, n)
+        self._metric_changed("qty:" + pid, p["qty"])
+        return n
+
+    def buy_upgrade(self, uid):
+        """Buy upgrade uid if unlocked, not yet purchased and affordable. Returns True on purchase."""
+        state = self.state
+        u = state["upgrades"][uid]
+
+        if u["purchased"] or uid not in self.unlocked: return False
+
+        if state["money"] < u["cost"]: return False
+
+        state["money"] -= u["cost"]
+
+        if u["type"] == "click":
+            state["click_power"] *= u["mult"]
+        elif u["type"] == "producer":
+            state["producers"][u["target"]]["mult"] *= u["mult"]
+            self.changed_producers.add(u["target"])
+            self._update_rate(u["target"])
+
+        u["purchased"] = True
+        self.changed_upgrades.add(uid)
+        state["total_upgrades"] += 1
+
+        self._emit("upgrade", uid)
+        self._metric_changed("total_upgrades", state["total_upgrades"])
+        return True
+
+    def tick(self, dt=TICK_SECONDS):
+        """Advance the simulation by dt seconds of production."""
+        state = self.state
+        prod = self.production * dt
+        self.elapsed += dt
+        state["cups"] = promote(state["cups"] + prod)
+        state["money"] = promote(state["money"] + prod)
+
+        self._emit("tick", dt)
+        self._metric_changed("cups", state["cups"])
+        self._metric_changed("money", state["money"])
+
+    def run(self, ticks, dt=TICK_SECONDS):
+        """Simulate ticks steps of dt seconds.
+
+        Production is constant between purchases, so the whole span is applied in a single step.
+        """
+        self.tick(ticks * dt)
+
+    def catch_up(self, last_saved, now=None):
+        """Credit the production earned since last_saved in one step.
+
+        Nothing is bought while the game is closed, so production is constant and cups/money only grow.
+        A single tick over the whole span therefore unlocks every achievement and upgrade crossed meanwhile.
+        Returns (elapsed seconds, cups earned).
+        """
+        if not last_saved: return 0.0, 0.0
+
+        now = time.time() if now is None else now
+        elapsed = max(0.0, now - last_saved)
+        earned = self.production * elapsed
+
+        self.tick(elapsed)
+        return elapsed, earned
+
+    def _metric_changed(self, metric, value):
+        """Unlock the achievements and upgrade conditions of metric whose threshold value has reached."""
+        for name in self.achievement_index.crossed(metric, value):
+            self.achievements.add(name)
+            self.state["achievements"].append(name)
+            self._emit("achievement", name)
+
+        for uid in self.unlock_index.crossed(metric, value):
+            self._unmet[uid] -= 1
+
+            if not self._unmet[uid]:
+                del self._unmet[uid]
+                self._unlock(uid)
+
+    def _unlock(self, uid):
+        self.unlocked.add(uid)
+        self.changed_upgrades.add(uid)
+        self.state["upgrades"][uid]["unlocked"] = True
+        self._emit("unlock", uid)
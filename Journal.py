@@ -0,0 +1,265 @@
+import argparse
+import json
+import sqlite3
+import time
+from collections import deque
+
+from DatabaseManager import DatabaseManager, DEFAULT_SLOT
+from GameEngine import GameEngine
+
+class Journal:
+    def __init__(self, db_name="coffee.db", save_id=1, keep_snapshots=3):
+        """Append-only log of player actions for one save, with periodic snapshots.
+
+        Entries are (kind, target, amount): ("tick", count, seconds), ("click", None, count),
+        ("producer", pid, n) and ("upgrade", uid, 1). A run of equal engine ticks is stored as one
+        entry with its count (None for a single tick), and replayed tick by tick, so the replayed
+        floats match the live ones exactly. Recording only queues entries in memory; flush() writes
+        them (serialising snapshots there too) and may run on a background thread. Only the newest keep_snapshots snapshots and the entries after the
+        oldest of them are kept (None keeps everything). The snapshot taken with session_start=True and
+        the entries after it are never compacted, so the current session can always be replayed in full.
+        """
+        self.conn = sqlite3.connect(db_name, check_same_thread=False)
+        self.conn.execute("PRAGMA journal_mode=WAL")
+        self.conn.execute("PRAGMA synchronous=NORMAL")
+        self.save_id = save_id
+        self.keep_snapshots = keep_snapshots
+        self.pending = deque()  # appended on the game thread, drained by flush()
+        self.engine = None
+        self.ticks = None  # (dt, count) of the current run of equal ticks, not yet queued
+        self.session_start = None  # (id, seq) of this session's first snapshot, once written
+        self._create_tables()
+
+    def _create_tables(self):
+        with self.conn:
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS journal (
+                    seq INTEGER PRIMARY KEY AUTOINCREMENT,
+                    save_id INTEGER NOT NULL,
+                    at REAL NOT NULL,
+                    kind TEXT NOT NULL,
+                    target TEXT,
+                    amount REAL NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS journal_save_seq ON journal (save_id, seq)")
+            self.conn.execute('''
+                CREATE TABLE IF NOT EXISTS journal_snapshot (
+                    id INTEGER PRIMARY KEY AUTOINCREMENT,
+                    save_id INTEGER NOT NULL,
+                    seq INTEGER NOT NULL,
+                    at REAL NOT NULL,
+                    progress TEXT NOT NULL
+                )
+            ''')
+            self.conn.execute("CREATE INDEX IF NOT EXISTS journal_snapshot_save ON journal_snapshot (save_id, seq)")
+
+    # --- Recording ---
+
+    def attach(self, engine):
+        """Record engine actions from now on."""
+        self.engine = engine
+        engine.add_listener(self._on_event)
+
+    def _on_event(self, event, *args):
+        if event == "tick":
+            if self.ticks is not None and self.ticks[0] == args[0]:
+                self.ticks = (args[0], self.ticks[1] + 1)
+            else:
+                self._record_time()
+                self.ticks = (args[0], 1)
+        elif event == "click":
+            self._record_time()
+            self.pending.append((time.time(), "click", None, args[1]))
+        elif event == "producer":
+            self._record_time()
+            self.pending.append((time.time(), "producer", args[0], args[1]))
+        elif event == "upgrade":
+            self._record_time()
+            self.pending.append((time.time(), "upgrade", args[0], 1))
+
+    def _record_time(self):
+        if self.ticks is None: return
+
+        dt, count = self.ticks
+        self.pending.append((time.time(), "tick", str(count) if count > 1 else None, dt))
+        self.ticks = None
+
+    def snapshot(self, session_start=False):
+        """Queue a snapshot of the attached engine's progress, in order with the recorded actions.
+
+        session_start marks the snapshot a full-session replay starts from; compact() keeps it.
+        """
+        self._record_time()
+        self.pending.append((time.time(), "snapshot", "start" if session_start else None, self.engine.progress()))
+
+    def flush(self, _=None):
+        """Write all queued entries and snapshots in one transaction. Accepts and ignores an AutoSaver snapshot."""
+        if not self.pending: return
+
+        snapshotted = False
+
+        with self.conn:
+            batch = []
+
+            while self.pending:
+                at, kind, target, amount = self.pending.popleft()
+
+                if kind != "snapshot":
+                    batch.append((self.save_id, at, kind, target, amount))
+                    continue
+
+                self._insert(batch)
+                batch = []
+                seq = self._last_seq()
+                cursor = self.conn.execute(
+                    "INSERT INTO journal_snapshot (save_id, seq, at, progress) VALUES (?, ?, ?, ?)",
+                    (self.save_id, seq, at, json.dumps(amount))
+                )
+                snapshotted = True
+
+                if target == "start":
+                    self.session_start = (cursor.lastrowid, seq)
+
+            self._insert(batch)
+
+            if snapshotted and self.keep_snapshots:
+                self.compact()
+
+    def _insert(self, batch):
+        if batch:
+            self.conn.executemany("INSERT INTO journal (save_id, at, kind, target, amount) VALUES (?, ?, ?, ?, ?)", batch)
+
+    def _last_seq(self):
+        row = self.conn.execute("SELECT MAX(seq) FROM journal WHERE save_id=?", (self.save_id,)).fetchone()
+        return row[0] or 0
+
+    def compact(self):
+        """Drop snapshots beyond the newest keep_snapshots, and the journal entries they made redundant.
+
+        The session-start snapshot and every entry after it are kept whatever keep_snapshots says.
+        """
+        rows = self.conn.execute(
+            "SELECT id, seq FROM journal_snapshot WHERE save_id=? ORDER BY id DESC LIMIT 1 OFFSET ?",
+            (self.save_id, self.keep_snapshots - 1)
+        ).fetchall()
+
+        if not rows: return
+
+        oldest_id, oldest_seq = rows[0]
+        start_id = None
+
+        if self.session_start is not None:
+            start_id, start_seq = self.session_start
+            oldest_seq = min(oldest_seq, start_seq)
+
+        with self.conn:
+            self.conn.execute(
+                "DELETE FROM journal_snapshot WHERE save_id=? AND id < ? AND id IS NOT ?", (self.save_id, oldest_id, start_id)
+            )
+            self.conn.execute("DELETE FROM journal WHERE save_id=? AND seq <= ?", (self.save_id, oldest_seq))
+
+    # --- Reading ---
+
+    def latest_snapshot(self, oldest=False):
+        """(seq, progress) of the newest (or oldest retained) snapshot, or None."""
+        order = "ASC" if oldest else "DESC"
+        row = self.conn.execute(
+            f"SELECT seq, progress FROM journal_snapshot WHERE save_id=? ORDER BY id {order} LIMIT 1", (self.save_id,)
+        ).fetchone()
+
+        return (row[0], json.loads(row[1])) if row else None
+
+    def entries(self, after_seq=0):
+        """Yield (at, kind, target, amount) recorded after after_seq, oldest first."""
+        cursor = self.conn.execute(
+            "SELECT at, kind, target, amount FROM journal WHERE save_id=? AND seq > ? ORDER BY seq", (self.save_id, after_seq)
+        )
+
+        yield from cursor
+
+    def recover(self, engine):
+        """Restore the latest snapshot into engine and replay the entries after it.
+
+        Returns the number of entries replayed, or None when there is no snapshot to recover from.
+        """
+        found = self.latest_snapshot()
+
+        if found is None: return None
+
+        seq, progress = found
+        engine.restore(progress)
+        return replay(engine, self.entries(seq))
+
+    def close(self):
+        self.conn.close()
+
+def replay(engine, entries):
+    """Apply journal entries to engine at full speed. Returns the number of entries applied.
+
+    When the last entry is later than the state's last_saved time, last_saved is moved up to it so
+    the offline catch-up does not count the replayed time twice.
+    """
+    count = 0
+    last_at = None
+
+    for at, kind, target, amount in entries:
+        if kind == "tick":
+            for _ in range(int(target or 1)):
+                engine.tick(amount)
+        elif kind == "click":
+            engine.click(int(amount))
+        elif kind == "producer":
+            engine.buy_producer(target, int(amount))
+        elif kind == "upgrade":
+            engine.buy_upgrade(target)
+
+        count += 1
+        last_at = at
+
+    if last_at is not None and last_at > engine.state["last_saved"]:
+        engine.state["last_saved"] = last_at
+
+    return count
+
+def replay_session(db_name="coffee.db", save_id=1):
+    """Rebuild a save from its oldest retained snapshot (or a new game) plus every entry after it."""
+    journal = Journal(db_name, save_id)
+    engine = GameEngine()
+    found = journal.latest_snapshot(oldest=True)
+    seq = 0
+
+    if found is not None:
+        seq, progress = found
+        engine.restore(progress)
+
+    start = time.perf_counter()
+    count = replay(engine, journal.entries(seq))
+    journal.close()
+
+    return engine, count, time.perf_counter() - start
+
+# ========================
+# COMMAND LINE
+# ========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Replay a Coffee Empire action journal.")
+    parser.add_argument("--db", default="coffee.db")
+    parser.add_argument("--slot", default=DEFAULT_SLOT, help="name of the save slot to replay")
+    args = parser.parse_args()
+
+    db = DatabaseManager(args.db)
+    save_id = db.find_slot(args.slot)
+    db.conn.close()
+
+    if save_id is None:
+        parser.error(f"no save slot named {args.slot!r} in {args.db}")
+
+    engine, count, seconds = replay_session(args.db, save_id)
+    state = engine.state
+
+    print(f"Replayed {count} entries in {seconds * 1000:.1f} ms")
+    print(f"Cups: {state['cups']:.1f}  Money: {state['money']:.1f}  Production: {engine.production:.1f}/sec")
+    print(f"Clicks: {state['total_clicks']}  Upgrades: {state['total_upgrades']}")
+    print("Producers: " + ", ".join(f"{pid} x{p['qty']}" for pid, p in state["producers"].items()))
+    print("Achievements: " + (", ".join(state["achievements"]) or "None"))
@@ -0,0 +1,94 @@
+import functools
+import json
+import os
+import time
+from collections import deque
+
+PERF_SAMPLES = 1024  # samples kept per timer
+PERCENTILES = (50, 95, 99)
+
+class RingBuffer:
+    def __init__(self, size=PERF_SAMPLES):
+        """The last size samples of a timer, plus a running count of every sample ever added."""
+        self.samples = deque(maxlen=size)
+        self.count = 0
+
+    def add(self, value):
+        self.samples.append(value)
+        self.count += 1
+
+    def summary(self):
+        """count, last, mean, percentiles and max of the retained samples, in milliseconds."""
+        samples = self.samples.copy()  # atomic, while another thread may be appending
+        times = sorted(samples)
+
+        if not times:
+            return {"count": 0}
+
+        summary = {
+            "count": self.count,
+            "last_ms": samples[-1] * 1000,
+            "mean_ms": sum(times) / len(times) * 1000,
+        }
+
+        for p in PERCENTILES:
+            summary[f"p{p}_ms"] = times[min(len(times) - 1, int(len(times) * p / 100))] * 1000
+
+        summary["max_ms"] = times[-1] * 1000
+        return summary
+
+class PerfRecorder:
+    def __init__(self, size=PERF_SAMPLES):
+        """Named timers, each recording call durations into its own RingBuffer.
+
+        Instrumentation is opt-in: timed() wraps a function once, so code that is never wrapped pays
+        nothing. Timers may record from other threads (deque appends are atomic); their buffers are
+        created up front by timed() so the set of timers never changes while being read.
+        """
+        self.size = size
+        self.buffers = {}
+
+    def buffer(self, name):
+        """The RingBuffer of timer name, created on first use."""
+        if name not in self.buffers:
+            self.buffers[name] = RingBuffer(self.size)
+
+        return self.buffers[name]
+
+    def record(self, name, seconds):
+        self.buffer(name).add(seconds)
+
+    def timed(self, name, fn):
+        """fn wrapped so the duration of every call is recorded under name."""
+        buffer = self.buffer(name)
+
+        @functools.wraps(fn)
+        def wrapper(*args, **kwargs):
+            start = time.perf_counter()
+
+            try:
+                return fn(*args, **kwargs)
+            finally:
+                buffer.add(time.perf_counter() - start)
+
+        return wrapper
+
+    def summary(self):
+        """{name: RingBuffer.summary()} for every timer."""
+        return {name: buffer.summary() for name, buffer in self.buffers.items()}
+
+    def export(self, path, **extra):
+        """Write the summaries, the raw samples (ms) and any extra JSON-friendly data to path."""
+        data = {
+            "exported_at": time.time(),
+            "summary": self.summary(),
+            "samples_ms": {name: [s * 1000 for s in buffer.samples.copy()] for name, buffer in self.buffers.items()},
+            **extra,
+        }
+
+        tmp = path + ".tmp"
+
+        with open(tmp, "w") as f:
+            json.dump(data, f, indent=1)
+
+        os.replace(tmp, path)
@@ -0,0 +1,177 @@
+from collections.abc import Mapping, MutableMapping
+
+from BigNum import BigNum, FLOAT_LIMIT
+from GameEngine import EXACT_INT, get_cost, get_bulk_cost, get_max_affordable
+
+try:
+    import numpy as np
+except ImportError:  # the table still works, just without vectorized math
+    np = None
+
+NUMERIC = ("baseProd", "mult", "qty", "baseCost", "costMul")
+
+class ProducerTable(Mapping):
+    def __init__(self, producers):
+        """Column store for producer definitions: one array per numeric field, one row per producer.
+
+        Behaves like the usual {pid: producer dict} mapping through ProducerRow views, so existing
+        code keeps working, while production and cost math run as vector operations over the columns
+        when NumPy is installed. The vector math covers the float range; prices or money past
+        FLOAT_LIMIT fall back to the per-row functions, which return BigNums there.
+        """
+        self.ids = list(producers)
+        self.index = {pid: i for i, pid in enumerate(self.ids)}
+        self.extra = [{k: v for k, v in p.items() if k not in NUMERIC} for p in producers.values()]  # name, icon, ...
+        self.columns = {}
+
+        for field in NUMERIC:
+            values = [p[field] for p in producers.values()]
+
+            if np is not None:
+                values = np.array(values, dtype=np.int64 if field == "qty" else np.float64)
+
+            self.columns[field] = values
+
+        self.rows = {pid: ProducerRow(self, i) for i, pid in enumerate(self.ids)}
+
+    def __getitem__(self, pid): return self.rows[pid]
+
+    def __iter__(self): return iter(self.ids)
+
+    def __len__(self): return len(self.ids)
+
+    def to_dict(self):
+        """Plain {pid: dict} copy, e.g. for JSON."""
+        return {pid: dict(row) for pid, row in self.rows.items()}
+
+    # --- Vector math ---
+
+    def rates(self):
+        """Cups/sec of every producer, in table order."""
+        c = self.columns
+
+        if np is None:
+            return [q * b * m for q, b, m in zip(c["qty"], c["baseProd"], c["mult"])]
+
+        return c["qty"] * c["baseProd"] * c["mult"]
+
+    def production(self):
+        """Total cups/sec: the dot product of qty * baseProd with mult."""
+        c = self.columns
+
+        if np is None:
+            return sum(self.rates())
+
+        return float(np.dot(c["qty"] * c["baseProd"], c["mult"]))
+
+    def next_costs(self):
+        """Price of the next unit of every producer, matching get_cost()."""
+        if np is None:
+            return [get_cost(row) for row in self.rows.values()]
+
+        return self.bulk_costs(1)
+
+    def bulk_costs(self, n):
+        """Price of the next n units (a count, or one count per producer) of every producer, matching get_bulk_cost().
+
+        NumPy's power can differ from Python's in the last bit, so prices near EXACT_INT and above may
+        differ from get_bulk_cost() by that much. If any price reaches FLOAT_LIMIT, the result is a list
+        from get_bulk_cost() instead, with BigNums for those prices.
+        """
+        if np is None:
+            return self._row_bulk_costs(n)
+
+        costs = self._bulk_costs(n)
+
+        if (costs < FLOAT_LIMIT).all(): return costs
+
+        return self._row_bulk_costs(n)
+
+    def _row_bulk_costs(self, n):
+        counts = n if hasattr(n, "__len__") else [n] * len(self.ids)
+        return [get_bulk_cost(row, int(k)) for row, k in zip(self.rows.values(), counts)]
+
+    def _bulk_costs(self, n):
+        """bulk_costs() as float64, with inf where a price overflows."""
+        c = self.columns
+        n = np.broadcast_to(np.asarray(n, dtype=np.float64), c["qty"].shape)
+        r = c["costMul"]
+
+        def spent(k):
+            return np.where(r == 1, c["baseCost"] * k, c["baseCost"] * (r ** k - 1) / (r - 1))
+
+        with np.errstate(divide="ignore", invalid="ignore", over="ignore"):
+            first = c["baseCost"] * r ** c["qty"]
+            series = np.where(r == 1, first * n, first * (r ** n - 1) / (r - 1))
+            end = spent(c["qty"] + n)
+            whole = np.floor(end) - np.floor(spent(c["qty"]))
+
+        costs = np.where(end < EXACT_INT, whole, series)
+        return np.where(n <= 0, 0, costs)
+
+    def max_affordable(self, money):
+        """Largest count of every producer that money can buy, matching get_max_affordable()."""
+        if np is None or type(money) is BigNum or money >= FLOAT_LIMIT:
+            return self._row_max_affordable(money)
+
+        c = self.columns
+        r = c["costMul"]
+
+        with np.errstate(over="ignore"):
+            first = c["baseCost"] * r ** c["qty"]
+
+        if not (first < FLOAT_LIMIT).all():
+            return self._row_max_affordable(money)
+
+        with np.errstate(divide="ignore", invalid="ignore"):
+            n = np.where(r == 1, np.floor(money / first), np.floor(np.log(money * (r - 1) / first + 1) / np.log(r)))
+
+        n = np.where(money < self._bulk_costs(1), 0, np.maximum(n, 0))
+
+        # the logarithm can land one off either side of an exact boundary
+        n = np.where((n > 0) & (self._bulk_costs(n) > money), n - 1, n)
+        n = np.where(self._bulk_costs(n + 1) <= money, n + 1, n)
+
+        return n.astype(np.int64)
+
+    def _row_max_affordable(self, money):
+        return [get_max_affordable(row, money) for row in self.rows.values()]
+
+class ProducerRow(MutableMapping):
+    def __init__(self, table, i):
+        """Dict-compatible view of one producer row in a ProducerTable."""
+        self.table = table
+        self.i = i
+
+    def __getitem__(self, key):
+        column = self.table.columns.get(key)
+
+        if column is None:
+            return self.table.extra[self.i][key]
+
+        value = column[self.i]
+        return value.item() if np is not None else value
+
+    def __setitem__(self, key, value):
+        column = self.table.columns.get(key)
+
+        if column is None:
+            self.table.extra[self.i][key] = value
+        else:
+            column[self.i] = value
+
+    def __delitem__(self, key):
+        if key in self.table.columns:
+            raise KeyError(f"Cannot delete column field {key!r}.")
+
+        del self.table.extra[self.i][key]
+
+    def __iter__(self):
+        yield from self.table.extra[self.i]
+        yield from NUMERIC
+
+    def __len__(self):
+        return len(self.table.extra[self.i]) + len(NUMERIC)
+
+    def __repr__(self):
+        return repr(dict(self))
@@ -0,0 +1,85 @@
+import json
+import os
+import zlib
+
+MAGIC = b"CEMP"
+SAVE_VERSION = 2
+
+# ========================
+# ENCODING
+# ========================
+def encode(progress):
+    """Pack GameEngine.progress() data into the compact versioned save format.
+
+    Layout: MAGIC, one version byte, then zlib-compressed JSON of
+    [cups, money, click_power, total_clicks, total_upgrades, last_saved, achievements,
+     {pid: [qty, mult]}, {uid: purchased | unlocked << 1}]
+    """
+    body = [
+        progress["cups"],
+        progress["money"],
+        progress["click_power"],
+        progress["total_clicks"],
+        progress["total_upgrades"],
+        progress["last_saved"],
+        progress["achievements"],
+        progress["producers"],
+        {uid: int(bool(purchased)) | int(bool(unlocked)) << 1 for uid, (purchased, unlocked) in progress["upgrades"].items()},
+    ]
+
+    return MAGIC + bytes([SAVE_VERSION]) + zlib.compress(json.dumps(body, separators=(",", ":")).encode(), 1)
+
+def decode(data):
+    """Unpack a save written by encode() or by older versions (a plain JSON dump of the whole state)."""
+    if data[:1] == b"{":
+        return _from_legacy(json.loads(data))
+
+    if data[:4] != MAGIC:
+        raise ValueError("Not a Coffee Empire save file.")
+
+    version = data[4]
+
+    if version != SAVE_VERSION:
+        raise ValueError(f"Unsupported save version {version}.")
+
+    cups, money, click_power, total_clicks, total_upgrades, last_saved, achievements, producers, upgrades = json.loads(zlib.decompress(data[5:]))
+
+    return {
+        "cups": cups,
+        "money": money,
+        "click_power": click_power,
+        "total_clicks": total_clicks,
+        "total_upgrades": total_upgrades,
+        "last_saved": last_saved,
+        "achievements": achievements,
+        "producers": producers,
+        "upgrades": {uid: [bool(flags & 1), bool(flags & 2)] for uid, flags in upgrades.items()},
+    }
+
+def _from_legacy(loaded):
+    """Version 1: json.dump of the full state dict, definitions included."""
+    progress = {key: loaded[key] for key in ("cups", "money", "click_power", "total_clicks", "total_upgrades", "achievements", "last_saved") if key in loaded}
+    progress["producers"] = {pid: [p.get("qty", 0), p.get("mult", 1)] for pid, p in loaded.get("producers", {}).items()}
+    progress["upgrades"] = {uid: [u.get("purchased", False), u.get("unlocked", False)] for uid, u in loaded.get("upgrades", {}).items()}
+    return progress
+
+# ========================
+# FILES
+# ========================
+def write_save(path, progress):
+    """Write progress to path atomically: a crash mid-write leaves the previous save intact."""
+    tmp = path + ".tmp"
+
+    with open(tmp, "wb") as f:
+        f.write(encode(progress))
+        f.flush()
+        os.fsync(f.fileno())
+
+    os.replace(tmp, path)
+
+def read_save(path):
+    """Progress stored at path, or None if there is no save yet."""
+    if not os.path.exists(path): return None
+
+    with open(path, "rb") as f:
+        return decode(f.read())
@@ -0,0 +1,64 @@
+import time
+
+class FixedStepScheduler:
+    def __init__(self, rate=10, interval=0.016, max_steps=50, clock=time.monotonic):
+        """Convert monotonic clock time into whole simulation steps of 1/rate seconds.
+
+        advance() is meant to be called once per frame, every interval seconds. Time that does not
+        fill a whole step is kept in an accumulator, so late frames never lose production. At most
+        max_steps are handed out per call; any further backlog is carried into the following calls.
+        """
+        self.rate = rate
+        self.step = 1.0 / rate
+        self.interval = interval
+        self.max_steps = max_steps
+        self.clock = clock
+        self.accumulator = 0.0
+        self.last = None
+        self.reset_stats()
+
+    def reset_stats(self):
+        self.frames = 0
+        self.steps = 0
+        self.jitter_total = 0.0
+        self.jitter_max = 0.0
+
+    def start(self):
+        """Start measuring from now."""
+        self.last = self.clock()
+        self.accumulator = 0.0
+
+    def advance(self):
+        """Return the number of steps due since the previous call."""
+        now = self.clock()
+
+        if self.last is None:
+            self.last = now
+            return 0
+
+        elapsed = now - self.last
+        self.last = now
+
+        jitter = abs(elapsed - self.interval)
+        self.frames += 1
+        self.jitter_total += jitter
+
+        if jitter > self.jitter_max:
+            self.jitter_max = jitter
+
+        self.accumulator += elapsed
+        steps = min(int(self.accumulator * self.rate), self.max_steps)
+        self.accumulator -= steps * self.step
+        self.steps += steps
+
+        return steps
+
+    def stats(self):
+        """Measured loop timing since the last reset_stats(), in milliseconds where applicable."""
+        return {
+            "frames": self.frames,
+            "steps": self.steps,
+            "backlog_ms": self.accumulator * 1000,
+            "jitter_mean_ms": self.jitter_total / self.frames * 1000 if self.frames else 0.0,
+            "jitter_max_ms": self.jitter_max * 1000,
+        }
@@ -0,0 +1,262 @@
+import argparse
+import itertools
+import json
+import math
+import os
+import random
+import sys
+import time
+from multiprocessing import Pool
+
+from Catalogue import CONTENT_FILE, load_catalogue
+from GameEngine import GameEngine, get_cost
+
+HORIZON = 24 * 3600  # simulated seconds per run
+MIN_WAIT = 0.1  # never advance less than one tick, so rounding cannot stall a run
+
+# ========================
+# STRATEGIES
+# ========================
+# A strategy picks the next purchase, ("producer", pid) or ("upgrade", uid), or None to stop buying.
+# The target need not be affordable yet: the simulator waits until it is, then buys it.
+
+def candidates(engine):
+    """(kind, id, cost) of every producer and every unlocked, unbought upgrade."""
+    for pid, p in engine.state["producers"].items():
+        yield "producer", pid, get_cost(p)
+
+    for uid, u in engine.state["upgrades"].items():
+        if not u["purchased"] and engine.is_unlocked(uid):
+            yield "upgrade", uid, u["cost"]
+
+def gain(engine, kind, id, clicks_per_sec):
+    """Extra cups/sec the purchase would add."""
+    state = engine.state
+
+    if kind == "producer":
+        p = state["producers"][id]
+        return p["baseProd"] * p["mult"]
+
+    u = state["upgrades"][id]
+
+    if u["type"] == "click":
+        return state["click_power"] * (u["mult"] - 1) * clicks_per_sec
+
+    return engine.rates.get(u["target"], 0) * (u["mult"] - 1)
+
+def greedy_payback(engine, rng, options):
+    """The purchase that pays for itself soonest, counting the wait to afford it."""
+    income = engine.production + engine.state["click_power"] * options["clicks_per_sec"]
+    money = engine.state["money"]
+    best, best_time = None, math.inf
+
+    for kind, id, cost in candidates(engine):
+        extra = gain(engine, kind, id, options["clicks_per_sec"])
+
+        if extra <= 0: continue
+
+        wait = max(0.0, cost - money) / income if income else (0.0 if cost <= money else math.inf)
+        payback = wait + cost / extra
+
+        if payback < best_time:
+            best, best_time = (kind, id), payback
+
+    return best
+
+def cheapest_first(engine, rng, options):
+    """Whatever costs least right now."""
+    best = min(candidates(engine), key=lambda c: c[2], default=None)
+    return best[:2] if best else None
+
+def random_choice(engine, rng, options):
+    """A random purchase among those affordable within a minute of income, or the cheapest if none are."""
+    income = engine.production + engine.state["click_power"] * options["clicks_per_sec"]
+    reach = engine.state["money"] + income * 60
+    pool = list(candidates(engine))
+    near = [c for c in pool if c[2] <= reach]
+
+    if near:
+        return rng.choice(near)[:2]
+
+    return cheapest_first(engine, rng, options)
+
+def scripted(engine, rng, options):
+    """The next id from options["script"], in order; ids are looked up as producers, then upgrades.
+
+    Upgrades that are already bought, or still locked when their turn comes, are skipped.
+    """
+    script = options["script"]
+
+    while options["step"] < len(script):
+        id = script[options["step"]]
+
+        if id in engine.state["producers"]:
+            return "producer", id
+
+        if id in engine.state["upgrades"] and not engine.state["upgrades"][id]["purchased"] and engine.is_unlocked(id):
+            return "upgrade", id
+
+        options["step"] += 1  # unknown, bought or locked
+
+    return None
+
+STRATEGIES = {
+    "greedy": greedy_payback,
+    "cheapest": cheapest_first,
+    "random": random_choice,
+    "scripted": scripted,
+}
+
+# ========================
+# SIMULATION
+# ========================
+def simulate(job):
+    """Play one strategy for job["horizon"] simulated seconds and return a result dict.
+
+    job: strategy, seed, horizon, clicks_per_sec, cost_mul (None keeps the catalogue's), script and
+    content (the definitions file). Production is constant between purchases, so time jumps straight
+    to the moment the next target becomes affordable instead of ticking through the wait.
+    """
+    start = time.perf_counter()
+    engine = GameEngine(catalogue=load_catalogue(job["content"]))
+    state = engine.state
+
+    if job["cost_mul"] is not None:
+        for p in state["producers"].values():
+            p["costMul"] = job["cost_mul"]
+
+    choose = STRATEGIES[job["strategy"]]
+    rng = random.Random(job["seed"])
+    options = {"clicks_per_sec": job["clicks_per_sec"], "script": job.get("script") or [], "step": 0}
+    horizon = job["horizon"]
+    clicks_owed = 0.0
+    purchases = 0
+    now = 0.0
+
+    def advance(dt):
+        nonlocal clicks_owed, now
+        engine.tick(dt)
+        clicks_owed += options["clicks_per_sec"] * dt
+        clicks = int(clicks_owed)
+
+        if clicks:
+            engine.click(clicks)
+            clicks_owed -= clicks
+
+        now += dt
+
+    while now < horizon:
+        target = choose(engine, rng, options)
+        income = engine.production + state["click_power"] * options["clicks_per_sec"]
+
+        if target is None or not income and state["money"] < _cost(engine, target):
+            break  # nothing left to buy, or no way to ever afford it
+
+        kind, id = target
+        cost = _cost(engine, target)
+
+        if state["money"] < cost:
+            advance(min(horizon - now, max(MIN_WAIT, (cost - state["money"]) / income)))
+            continue
+
+        bought = engine.buy_producer(id) if kind == "producer" else engine.buy_upgrade(id)
+
+        if not bought: break  # a strategy picked something the rules do not allow
+
+        purchases += 1
+        options["step"] += 1  # only the scripted strategy reads it
+
+    if now < horizon:
+        advance(horizon - now)
+
+    return {
+        "strategy": job["strategy"],
+        "seed": job["seed"],
+        "cost_mul": job["cost_mul"],
+        "clicks_per_sec": job["clicks_per_sec"],
+        "cups": float(state["cups"]),
+        "money": float(state["money"]),
+        "production": engine.production,
+        "purchases": purchases,
+        "upgrades": state["total_upgrades"],
+        "achievements": len(state["achievements"]),
+        "producers": {pid: p["qty"] for pid, p in state["producers"].items()},
+        "seconds": time.perf_counter() - start,
+    }
+
+def _cost(engine, target):
+    kind, id = target
+
+    if kind == "producer":
+        return get_cost(engine.state["producers"][id])
+
+    return engine.state["upgrades"][id]["cost"]
+
+def jobs(strategies, seeds=1, cost_muls=(None,), clicks_per_sec=(5,), horizon=HORIZON, script=None, content=CONTENT_FILE):
+    """Every combination of the given variations. Only the random strategy gets more than one seed."""
+    for strategy, cost_mul, cps in itertools.product(strategies, cost_muls, clicks_per_sec):
+        for seed in range(seeds if strategy == "random" else 1):
+            yield {
+                "strategy": strategy,
+                "seed": seed,
+                "cost_mul": cost_mul,
+                "clicks_per_sec": cps,
+                "horizon": horizon,
+                "script": script,
+                "content": content,
+            }
+
+def run(jobs, workers=None, chunksize=4):
+    """Yield results as each run finishes, spread over a pool of worker processes (all cores by default)."""
+    with Pool(workers or os.cpu_count()) as pool:
+        yield from pool.imap_unordered(simulate, jobs, chunksize)
+
+# ========================
+# COMMAND LINE
+# ========================
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Simulate Coffee Empire purchase strategies in parallel.")
+    parser.add_argument("--strategy", nargs="+", choices=list(STRATEGIES), default=["greedy", "cheapest", "random"])
+    parser.add_argument("--hours", type=float, default=HORIZON / 3600, help="simulated hours per run (default 24)")
+    parser.add_argument("--seeds", type=int, default=10, help="runs per variation of the random strategy")
+    parser.add_argument("--cost-mul", type=float, nargs="+", default=[None], help="override every producer's costMul")
+    parser.add_argument("--clicks-per-sec", type=float, nargs="+", default=[5], help="simulated click rate(s)")
+    parser.add_argument("--script", help="comma-separated producer/upgrade ids for the scripted strategy")
+    parser.add_argument("--content", default=CONTENT_FILE, help="definitions file to simulate")
+    parser.add_argument("--workers", type=int, help="worker processes (default: all cores)")
+    parser.add_argument("--out", help="also write results to this file, one JSON object per line")
+    args = parser.parse_args()
+
+    script = args.script.split(",") if args.script else None
+
+    if "scripted" in args.strategy and not script:
+        parser.error("the scripted strategy needs --script")
+
+    if any(mul is not None and mul <= 1 for mul in args.cost_mul):
+        parser.error("--cost-mul values must be greater than 1")
+
+    load_catalogue(args.content)  # validate (and cache) once, before the workers start
+    todo = list(jobs(args.strategy, args.seeds, args.cost_mul, args.clicks_per_sec, args.hours * 3600, script, args.content))
+    out = open(args.out, "w") if args.out else None
+    best = {}
+    start = time.perf_counter()
+
+    for i, result in enumerate(run(todo, args.workers), 1):
+        line = json.dumps(result)
+        print(line, flush=True)
+
+        if out:
+            out.write(line + "\n")
+
+        if result["cups"] > best.get(result["strategy"], {"cups": -1})["cups"]:
+            best[result["strategy"]] = result
+
+        print(f"[{i}/{len(todo)}] {result['strategy']} seed {result['seed']}: {result['cups']:.3g} cups", file=sys.stderr)
+
+    if out:
+        out.close()
+
+    print(f"\n{len(todo)} runs in {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    for strategy, result in sorted(best.items(), key=lambda item: -item[1]["cups"]):
+        print(f"best {strategy:<9} {result['cups']:>12.4g} cups  {result['production']:>10.4g}/sec  (seed {result['seed']}, costMul {result['cost_mul']}, {result['clicks_per_sec']} clicks/sec)", file=sys.stderr)
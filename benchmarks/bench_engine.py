@@ -0,0 +1,44 @@
+"""Headless engine throughput: ticks and clicks per second against catalogue size."""
+from common import SIZES, make_engine, pad_catalogue, timed
+from GameEngine import GameEngine
+
+def tick_throughput(sizes=SIZES, ticks=100000):
+    """Ticks/sec of GameEngine.tick(), plus the cost of a full rebuild(), per catalogue size."""
+    results = []
+
+    for size in sizes:
+        engine = make_engine(size, size)
+        seconds = timed(lambda: [engine.tick() for _ in range(ticks)], 3)
+
+        results.append({
+            "catalogue_extra": size,
+            "ticks_per_sec": ticks / seconds,
+            "rebuild_ms": timed(engine.rebuild, 5) * 1000,
+        })
+
+    return results
+
+def click_rate(clicks=100000, batch=100):
+    """Clicks/sec applied one at a time and in batches, as the UI does after a burst of input."""
+    engine = pad_catalogue(GameEngine())
+    single = timed(lambda: [engine.click() for _ in range(clicks)], 3)
+    batched = timed(lambda: [engine.click(batch) for _ in range(clicks // batch)], 3)
+
+    return [
+        {"mode": "single", "clicks_per_sec": clicks / single},
+        {"mode": f"batch of {batch}", "clicks_per_sec": clicks / batched},
+    ]
+
+def run():
+    return {"tick": tick_throughput(), "click": click_rate()}
+
+if __name__ == "__main__":
+    results = run()
+
+    print(f"{'extra items':>12} {'ticks/sec':>14} {'rebuild ms':>12}")
+    for r in results["tick"]:
+        print(f"{r['catalogue_extra']:>12} {r['ticks_per_sec']:>14,.0f} {r['rebuild_ms']:>12.3f}")
+
+    print()
+    for r in results["click"]:
+        print(f"{r['mode']:>12} {r['clicks_per_sec']:>14,.0f} clicks/sec")
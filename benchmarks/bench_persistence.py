@@ -0,0 +1,84 @@
+"""Save/load round trips through game.py's DB and file paths as the save grows."""
+import os
+import tempfile
+
+from common import SIZES, pad_catalogue, timed
+from DatabaseManager import DatabaseManager
+from GameEngine import GameEngine
+import game
+
+def use_engine(extra):
+    """Point game.py at a fresh engine with a padded catalogue and some progress."""
+    game.engine = pad_catalogue(GameEngine(), extra, extra)
+    game.state = game.engine.state
+    game.state["money"] = 1e9
+
+    for pid in game.state["producers"]:
+        game.engine.buy_producer(pid, 10)
+
+def touch(n=10):
+    """Change a few producers, like a typical stretch of play between autosaves."""
+    for pid in list(game.state["producers"])[:n]:
+        game.engine.buy_producer(pid)
+
+def db_round_trip(sizes=SIZES, repeat=20):
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        for size in sizes:
+            game.db = DatabaseManager(os.path.join(tmp, f"bench_{size}.db"), wal=True)
+            game.save_id = game.db.open_slot("bench")
+            use_engine(size)
+
+            first = timed(lambda: game.save_db_state(game.engine.progress()), 1, warm_up=False)
+
+            def save():
+                touch()
+                game.save_db_state(game.engine.progress(changed_only=True))
+
+            results.append({
+                "catalogue_extra": size,
+                "first_save_ms": first * 1000,
+                "save_ms": timed(save, repeat) * 1000,
+                "load_ms": timed(game.load_db_state, repeat) * 1000,
+                "db_commit": game.db.commit_stats(),
+            })
+
+            game.db.conn.close()
+
+    game.db = None
+    return results
+
+def file_round_trip(sizes=SIZES, repeat=20):
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        game.STATE_FILE = os.path.join(tmp, "bench.sav")
+        game.LEGACY_STATE_FILE = os.path.join(tmp, "missing.json")
+
+        for size in sizes:
+            use_engine(size)
+
+            def save():
+                touch()
+                game.save_file_state(game.engine.progress())
+
+            results.append({
+                "catalogue_extra": size,
+                "save_ms": timed(save, repeat) * 1000,
+                "load_ms": timed(game.load_file_state, repeat) * 1000,
+                "bytes": os.path.getsize(game.STATE_FILE),
+            })
+
+    return results
+
+def run():
+    return {"db": db_round_trip(), "file": file_round_trip()}
+
+if __name__ == "__main__":
+    results = run()
+
+    print(f"{'extra items':>12} {'db first ms':>12} {'db save ms':>11} {'db load ms':>11} {'file save ms':>13} {'file load ms':>13} {'file bytes':>11}")
+
+    for d, f in zip(results["db"], results["file"]):
+        print(f"{d['catalogue_extra']:>12} {d['first_save_ms']:>12.3f} {d['save_ms']:>11.3f} {d['load_ms']:>11.3f} {f['save_ms']:>13.3f} {f['load_ms']:>13.3f} {f['bytes']:>11}")
@@ -0,0 +1,60 @@
+"""Round-trip benchmark: compact versioned save (SaveFile) vs. the old full-state json.dump path."""
+import json
+import os
+import tempfile
+import time
+
+from common import make_engine
+from SaveFile import read_save, write_save
+
+def legacy_round_trip(engine, path):
+    with open(path, "w") as f:
+        json.dump(engine.state, f)
+
+    with open(path, "r") as f:
+        loaded = json.load(f)
+
+    for k in engine.state:
+        if k in loaded:
+            engine.state[k] = loaded[k]
+
+def compact_round_trip(engine, path):
+    write_save(path, engine.progress())
+    engine.restore(read_save(path))
+
+def bench(fn, engine, path, repeat):
+    fn(engine, path)  # warm up
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        fn(engine, path)
+
+    return (time.perf_counter() - start) / repeat
+
+def run(sizes=(0, 100, 1000, 10000), repeat=20):
+    """Return one result dict per catalogue size."""
+    results = []
+
+    with tempfile.TemporaryDirectory() as tmp:
+        legacy_path = os.path.join(tmp, "legacy.json")
+        compact_path = os.path.join(tmp, "compact.sav")
+
+        for size in sizes:
+            legacy = bench(legacy_round_trip, make_engine(size, size), legacy_path, repeat)
+            compact = bench(compact_round_trip, make_engine(size, size), compact_path, repeat)
+
+            results.append({
+                "catalogue_extra": size,
+                "legacy_ms": legacy * 1000,
+                "legacy_bytes": os.path.getsize(legacy_path),
+                "compact_ms": compact * 1000,
+                "compact_bytes": os.path.getsize(compact_path),
+            })
+
+    return results
+
+if __name__ == "__main__":
+    print(f"{'extra items':>12} {'json ms':>10} {'json bytes':>12} {'compact ms':>12} {'compact bytes':>14}")
+
+    for r in run():
+        print(f"{r['catalogue_extra']:>12} {r['legacy_ms']:>10.3f} {r['legacy_bytes']:>12} {r['compact_ms']:>12.3f} {r['compact_bytes']:>14}")
@@ -0,0 +1,84 @@
+"""Cost of game.py's update_ui() against a hidden Tk root, as the catalogue grows. Needs a display."""
+import os
+import time
+import tkinter as tk
+
+from bench_persistence import use_engine
+from common import ROOT, timed
+import game
+
+UI_SIZES = (0, 100, 1000)
+
+def build_ui(extra):
+    """Build the game window for a padded catalogue, withdrawn so it never shows."""
+    use_engine(extra)
+
+    root = game.root = tk.Tk()
+    root.withdraw()
+    game.assets = game.ImageCache()  # PhotoImages belong to the Tk instance that created them
+    game.renderer = game.Renderer(root)
+    game.stats_label = game.setup_stats_label(root)
+    game.canvas = game.setup_canvas(root)
+    game.setup_brew_button(game.canvas, game.assets, game.brew_click)
+    game.floating = game.FloatingTextPool(game.canvas)
+
+    for widgets in (game.producer_widgets, game.upgrade_widgets, game.stats_widgets):
+        widgets.clear()
+
+    notebook = game.setup_notebook(root)
+    game.setup_producers_tab(notebook, game.assets, game.producer_widgets, game.state, game.buy_producer)
+    game.setup_upgrades_tab(notebook, game.assets, game.upgrade_widgets, game.state, game.buy_upgrade)
+    game.setup_stats_tab(notebook, game.stats_widgets)
+    return root
+
+def run(sizes=UI_SIZES, repeat=20):
+    """One result per catalogue size, or a single skipped entry when Tk cannot open a display."""
+    results = []
+    cwd = os.getcwd()
+    os.chdir(ROOT)  # images are loaded relative to the game directory
+
+    try:
+        for size in sizes:
+            start = time.perf_counter()
+
+            try:
+                root = build_ui(size)
+            except tk.TclError as e:
+                return [{"skipped": str(e)}]
+
+            build = time.perf_counter() - start
+
+            def full():
+                game.update_ui()
+                game.renderer.flush()
+                root.update_idletasks()
+
+            def frame():
+                game.engine.tick()
+                game.mark_money()
+                game.renderer.flush()
+                root.update_idletasks()
+
+            results.append({
+                "catalogue_extra": size,
+                "build_ms": build * 1000,
+                "update_ui_ms": timed(full, repeat) * 1000,
+                "frame_ms": timed(frame, repeat) * 1000,
+            })
+
+            root.destroy()
+    finally:
+        os.chdir(cwd)
+
+    return results
+
+if __name__ == "__main__":
+    results = run()
+
+    if "skipped" in results[0]:
+        print(f"Skipped: {results[0]['skipped']}")
+    else:
+        print(f"{'extra items':>12} {'build ms':>10} {'update_ui ms':>13} {'frame ms':>10}")
+
+        for r in results:
+            print(f"{r['catalogue_extra']:>12} {r['build_ms']:>10.1f} {r['update_ui_ms']:>13.3f} {r['frame_ms']:>10.3f}")
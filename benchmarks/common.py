@@ -0,0 +1,47 @@
+"""Shared helpers for the benchmarks: padded catalogues and a simple timer."""
+import os
+import sys
+import time
+
+ROOT = os.path.join(os.path.dirname(os.path.abspath(__file__)), "..")
+sys.path.insert(0, ROOT)
+
+from GameEngine import GameEngine
+
+SIZES = (0, 100, 1000, 10000)  # extra producers and upgrades added on top of the built-in content
+
+def pad_catalogue(engine, extra_producers=0, extra_upgrades=0):
+    """Grow engine's catalogue with generated producers and upgrades, then rebuild its caches."""
+    state = engine.state
+
+    for i in range(extra_producers):
+        state["producers"][f"gen_{i}"] = {"name": f"Generated {i}", "baseProd": i + 1, "baseCost": 10 * (i + 1), "costMul": 1.15, "qty": i % 50, "mult": 1, "icon": "shop.png"}
+
+    for i in range(extra_upgrades):
+        state["upgrades"][f"gen_up_{i}"] = {"type": "producer", "name": f"Generated Upgrade {i}", "target": "barista", "mult": 2, "cost": 100 * (i + 1), "purchased": i % 2 == 0, "unlocked": False, "unlock_at": {"money": i}, "icon": "beans.png"}
+
+    engine.rebuild()
+    return engine
+
+def make_engine(extra_producers=0, extra_upgrades=0):
+    """An engine with some progress and, optionally, a padded catalogue to grow the save."""
+    engine = pad_catalogue(GameEngine(), extra_producers, extra_upgrades)
+    engine.state["money"] = 1e9
+    engine.click(500)
+
+    for pid in engine.state["producers"]:
+        engine.buy_producer(pid, 10)
+
+    return engine
+
+def timed(fn, repeat, warm_up=True):
+    """Mean seconds per call of fn() over repeat calls, after one warm-up call unless warm_up is False."""
+    if warm_up:
+        fn()
+
+    start = time.perf_counter()
+
+    for _ in range(repeat):
+        fn()
+
+    return (time.perf_counter() - start) / repeat
@@ -0,0 +1,115 @@
+"""Run every benchmark and write the results as JSON, optionally checking them against a baseline run.
+
+    python benchmarks/run_all.py --out results.json
+    python benchmarks/run_all.py --out new.json --compare results.json
+
+Metrics ending in _ms are lower-is-better and metrics ending in _per_sec higher-is-better. With
+--compare, any of them more than --tolerance worse than the baseline is listed and the exit status is 1.
+"""
+import argparse
+import json
+import platform
+import subprocess
+import sys
+import time
+
+import bench_engine
+import bench_persistence
+import bench_save_format
+import bench_ui
+from common import ROOT
+
+SUITES = {
+    "engine": bench_engine.run,
+    "persistence": bench_persistence.run,
+    "save_format": bench_save_format.run,
+    "ui": bench_ui.run,
+}
+
+def git_commit():
+    try:
+        return subprocess.run(["git", "rev-parse", "HEAD"], cwd=ROOT, capture_output=True, text=True, check=True).stdout.strip()
+    except (OSError, subprocess.CalledProcessError):
+        return None
+
+def run(names=SUITES):
+    results = {
+        "meta": {
+            "time": time.time(),
+            "commit": git_commit(),
+            "python": sys.version.split()[0],
+            "platform": platform.platform(),
+        },
+    }
+
+    for name in names:
+        start = time.perf_counter()
+        results[name] = SUITES[name]()
+        print(f"{name}: {time.perf_counter() - start:.1f} s", file=sys.stderr)
+
+    return results
+
+def flatten(results, prefix=""):
+    """{metric path: value} for every _ms and _per_sec number, e.g. "persistence.db[1000].save_ms"."""
+    metrics = {}
+
+    if isinstance(results, dict):
+        for key, value in results.items():
+            if key == "meta": continue
+
+            path = f"{prefix}.{key}" if prefix else key
+
+            if isinstance(value, (int, float)) and (key.endswith("_ms") or key.endswith("_per_sec")):
+                metrics[path] = value
+            else:
+                metrics.update(flatten(value, path))
+    elif isinstance(results, list):
+        for i, row in enumerate(results):
+            label = row.get("catalogue_extra", row.get("mode", i)) if isinstance(row, dict) else i
+            metrics.update(flatten(row, f"{prefix}[{label}]"))
+
+    return metrics
+
+def compare(results, baseline, tolerance=0.2):
+    """(metric, baseline, current) for every metric more than tolerance worse than in baseline."""
+    old = flatten(baseline)
+    regressions = []
+
+    for metric, value in flatten(results).items():
+        before = old.get(metric)
+
+        if not before or not value: continue
+
+        worse = value / before if metric.endswith("_ms") else before / value
+
+        if worse > 1 + tolerance:
+            regressions.append((metric, before, value))
+
+    return regressions
+
+if __name__ == "__main__":
+    parser = argparse.ArgumentParser(description="Run the Coffee Empire benchmarks.")
+    parser.add_argument("--out", help="write the JSON results here (default: stdout)")
+    parser.add_argument("--only", nargs="+", choices=list(SUITES), help="run only these suites")
+    parser.add_argument("--compare", metavar="BASELINE", help="a previous --out file to check for regressions")
+    parser.add_argument("--tolerance", type=float, default=0.2, help="allowed slowdown before a metric counts as a regression (default 0.2 = 20%%)")
+    args = parser.parse_args()
+
+    results = run(args.only or SUITES)
+    text = json.dumps(results, indent=1)
+
+    if args.out:
+        with open(args.out, "w") as f:
+            f.write(text)
+    else:
+        print(text)
+
+    if args.compare:
+        with open(args.compare) as f:
+            regressions = compare(results, json.load(f), args.tolerance)
+
+        for metric, before, after in regressions:
+            print(f"REGRESSION {metric}: {before:.4g} -> {after:.4g}", file=sys.stderr)
+
+        print(f"{len(regressions)} regression(s) against {args.compare}", file=sys.stderr)
+        sys.exit(1 if regressions else 0)
@@ -1,67 +1,81 @@
+import time
+STARTUP_T0 = time.perf_counter()  # taken before the other imports so their cost shows in the startup report
+
 import tkinter as tk
 from tkinter import ttk
+import argparse
 import json
 import os
-from DatabaseManager import DatabaseManager
+import sys
+from DatabaseManager import DatabaseManager, DEFAULT_SLOT
+from GameEngine import GameEngine, get_bulk_cost, TICK_SECONDS, BUY_MAX
+from BigNum import BigNum, from_plain
+from Scheduler import FixedStepScheduler
+from AutoSaver import AutoSaver
+from Journal import Journal
+from SaveFile import read_save, write_save
+from Perf import PerfRecorder
 
 # ========================
 # GAME STATE
 # ========================
-state = {
-    "cups": 0.0,
-    "money": 0.0,
-    "click_power": 1,
-    "total_clicks": 0,
-    "total_upgrades": 0,
-    "achievements": [],
-    "producers": {
-        "barista": {"name": "Hire Barista", "baseProd": 1, "baseCost": 2, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "barista.png"},
-        "machine": {"name": "Buy Coffee Machine", "baseProd": 5, "baseCost": 100, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "machine.png"},
-        "shop": {"name": "Open Coffee Shop", "baseProd": 20, "baseCost": 400, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"},
-        "farmer": {"name": "Hire Coffee Farmer", "baseProd": 100, "baseCost": 2000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"},
-        "factory": {"name": "Build Coffee Factory", "baseProd": 500, "baseCost": 20000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"},
-        "franchise": {"name": "Start Global Franchise", "baseProd": 5000, "baseCost": 200000, "costMul": 1.15, "qty": 0, "mult": 1, "icon": "shop.png"},
-    },
-    "upgrades": {
-        "stronger_hands": {"type": "click", "name": "Stronger Hands", "mult": 2, "cost": 200, "purchased": False, "unlock_at": {"money": 20}, "icon": "hands.png"},
-        "turbo_brewing": {"type": "click", "name": "Turbo Brewing", "mult": 3, "cost": 1000, "purchased": False, "unlock_at": {"money": 100}, "icon": "turbo.png"},
-        "better_beans": {"type": "producer", "name": "Better Beans", "target": "barista", "mult": 2, "cost": 500, "purchased": False, "unlock_at": {"producer": ("barista", 5)}, "icon": "beans.png"},
-        "cold_brew": {"type": "producer", "name": "Cold Brew", "target": "barista", "mult": 2.5, "cost": 10000, "purchased": False, "unlock_at": {"producer": ("barista", 75)}, "icon": "beans.png"},
-    }
-}
+engine = GameEngine()
+state = engine.state
 
 # UI references
 producer_widgets = {}
 upgrade_widgets = {}
 stats_widgets = {}
-images = {}  # keep references alive
-
-STATE_FILE = "coffee_empire_save.json"
+startup_phases = []  # (phase, seconds) in the order they ran
+buy_mode = None
+journal = None
+save_id = 1
+pending_clicks = 0
+perf = None  # PerfRecorder when started with --perf
+perf_path = None
+
+BUY_AMOUNTS = [("x1", "1"), ("x10", "10"), ("x100", "100"), ("Max", BUY_MAX)]
+
+STATE_FILE = "coffee_empire.sav"
+LEGACY_STATE_FILE = "coffee_empire_save.json"  # full-state JSON written by older versions
+SUFFIXES = ["", "K", "M", "B", "T", "Qa", "Qi", "Sx", "Sp", "Oc", "No", "Dc"]  # one per power of 1000
+FRAME_MS = 16
+ICON_SIZE = 64  # locked upgrades show a blank of this size until their icon is needed
+AUTOSAVE_MS = 30000
+JOURNAL_FLUSH_MS = 1000
+JOURNAL_KEEP_SNAPSHOTS = 10  # autosaves kept from earlier sessions; the current session is always kept whole
+PERF_REFRESH_MS = 500
+SIM_RATE = round(1 / TICK_SECONDS)  # simulation steps per second, independent of FRAME_MS
+FLOAT_POOL_SIZE = 8
 
 # ========================
 # HELPERS
 # ========================
 def format_num(n):
-    if n >= 1e6: return f"{n/1e6:.1f}M"
-    if n >= 1e3: return f"{n/1e3:.1f}K"
-    return f"{n:.0f}"
+    if n < 1e3: return f"{float(n):.0f}"
 
-def get_cost(p): return int(p["baseCost"] * (p["costMul"] ** p["qty"]))
+    exp = int(BigNum.of(n).log10())
+    group = exp // 3
 
-def get_total_production():
-    return sum(p["qty"] * p["baseProd"] * p["mult"] for p in state["producers"].values())
+    if group < len(SUFFIXES):
+        return f"{float(n / 10.0 ** (group * 3)):.1f}{SUFFIXES[group]}"
 
-def is_unlocked(u):
-    cond = u.get("unlock_at", {})
+    # past the named suffixes: scientific notation
+    n = BigNum.of(n)
+    return f"{n.m:.2f}e{n.e}"
 
-    if "money" in cond and state["money"] < cond["money"]: return False
+def clamp_real(value):
+    """value as a float for the REAL columns, capped at the largest float so ranking still works."""
+    return min(float(from_plain(value)), sys.float_info.max)
 
-    if "producer" in cond:
-        pid, qty = cond["producer"]
+def big_values(snapshot):
+    """JSON of the values too large for a float (kept as BigNum strings), or None."""
+    big = {key: snapshot[key] for key in ("cups", "money") if isinstance(snapshot[key], str)}
+    return json.dumps(big) if big else None
 
-        if state["producers"][pid]["qty"] < qty: return False
+def get_total_production(): return engine.get_total_production()
 
-    return True
+def is_unlocked(uid): return engine.is_unlocked(uid)
 
 def unlock_hint(u):
     cond = u.get("unlock_at", {})
@@ -78,16 +92,24 @@ def unlock_hint(u):
 # TOOLTIP CLASS
 # ========================
 class ToolTip:
-    def __init__(self, widget, text=""):
+    def __init__(self, widget, text="", item=None):
+        """Show text while the pointer is over widget, or only over canvas item item when one is given."""
         self.widget = widget
         self.text = text
+        self.item = item
         self.tip_window = None
-        widget.bind("<Enter>", self.show_tip)
-        widget.bind("<Leave>", self.hide_tip)
+
+        if item is None:
+            widget.bind("<Enter>", self.show_tip)
+            widget.bind("<Leave>", self.hide_tip)
+        else:
+            widget.tag_bind(item, "<Enter>", self.show_tip, add="+")
+            widget.tag_bind(item, "<Leave>", self.hide_tip, add="+")
 
     def show_tip(self, event=None):
         if self.tip_window or not self.text: return
-        x, y = self.widget.winfo_rootx() + 25, self.widget.winfo_rooty() + 20
+        left, top = self.widget.bbox(self.item)[:2] if self.item is not None else (0, 0)
+        x, y = self.widget.winfo_rootx() + left + 25, self.widget.winfo_rooty() + top + 20
         self.tip_window = tw = tk.Toplevel(self.widget)
         tw.wm_overrideredirect(True)
         tw.wm_geometry(f"+{x}+{y}")
@@ -103,127 +125,345 @@ class ToolTip:
 # GAME ACTIONS
 # ========================
 def brew_click():
-    gain = state["click_power"]
-    state["cups"] += gain
-    state["money"] += gain
-    state["total_clicks"] += 1
+    """Queue a click; queued clicks are applied as one batch at the start of the next frame."""
+    global pending_clicks
+    pending_clicks += 1
+    renderer.mark(apply_clicks)
 
-    floating_text(canvas, 60, 40, f"+{gain} coffee", color="saddlebrown")
-    check_achievements()
-    update_ui()
+def apply_clicks():
+    global pending_clicks
+    count, pending_clicks = pending_clicks, 0
+    engine.click(count)
+
+def get_buy_amount():
+    mode = buy_mode.get()
+    return mode if mode == BUY_MAX else int(mode)
 
 def buy_producer(pid):
-    p = state["producers"][pid]
-    cost = get_cost(p)
+    engine.buy_producer(pid, get_buy_amount())
 
-    if state["money"] >= cost:
-        state["money"] -= cost
-        p["qty"] += 1
+def buy_upgrade(uid):
+    engine.buy_upgrade(uid)
+
+def on_engine_event(event, *args):
+    if event == "tick":
+        return  # game_loop marks the money display once per frame
+    elif event == "click":
+        floating_text(60, 40, "+{} coffee", color="saddlebrown", amount=args[0])
+        renderer.mark(render_counters)
+    elif event == "producer":
+        renderer.mark(render_producer, args[0])
+    elif event == "upgrade":
+        u = state["upgrades"][args[0]]
+        renderer.mark(render_upgrade, args[0])
+        renderer.mark(render_counters)
+
+        if u["type"] == "producer":
+            renderer.mark(render_producer, u["target"])
+    elif event == "unlock":
+        renderer.mark(render_upgrade, args[0])
+        return
+    elif event == "achievement":
+        floating_text(60, 20, f"Achievement: {args[0]}", color="green")
+        renderer.mark(render_counters)
+        return
+
+    mark_money()
 
-    update_ui()
+# ========================
+# ANIMATIONS
+# ========================
+class FloatingTextPool:
+    def __init__(self, canvas, size=FLOAT_POOL_SIZE, steps=20, step_ms=30):
+        """A fixed set of reusable canvas text items, all animated by one shared ticker."""
+        self.canvas = canvas
+        self.steps = steps
+        self.step_ms = step_ms
+        self.free = [canvas.create_text(0, 0, text="", state="hidden", font=("Arial", 10, "bold")) for _ in range(size)]
+        self.active = []  # oldest first: {"item", "x", "y", "age", "text", "amount"}
+        self.ticker = None
+
+    def show(self, x, y, text, color="black", amount=None):
+        """Float text upward from (x, y).
+
+        With an amount, text is a template such as "+{} coffee". When the pool is full, the amount is
+        added to the newest live message with the same template instead of taking a new item.
+        """
+        if not self.free:
+            if amount is not None:
+                for msg in reversed(self.active):
+                    if msg["text"] == text and msg["amount"] is not None:
+                        msg["amount"] += amount
+                        msg["age"] = 0
+                        self.canvas.itemconfig(msg["item"], text=text.format(format_num(msg["amount"])))
+                        self.canvas.coords(msg["item"], msg["x"], msg["y"])
+                        return
+
+            self._release(self.active[0])
+
+        item = self.free.pop()
+        label = text if amount is None else text.format(format_num(amount))
+        self.canvas.itemconfig(item, text=label, fill=color, state="normal")
+        self.canvas.coords(item, x, y)
+        self.canvas.tag_raise(item)
+        self.active.append({"item": item, "x": x, "y": y, "age": 0, "text": text, "amount": amount})
+
+        if self.ticker is None:
+            self.ticker = self.canvas.after(self.step_ms, self._animate)
+
+    def _release(self, msg):
+        self.active.remove(msg)
+        self.canvas.itemconfig(msg["item"], state="hidden")
+        self.free.append(msg["item"])
+
+    def _animate(self):
+        self.ticker = None
+
+        for msg in list(self.active):
+            msg["age"] += 1
+
+            if msg["age"] > self.steps:
+                self._release(msg)
+            else:
+                self.canvas.coords(msg["item"], msg["x"], msg["y"] - msg["age"])
+
+        if self.active:
+            self.ticker = self.canvas.after(self.step_ms, self._animate)
+
+def floating_text(x, y, text, color="black", amount=None):
+    floating.show(x, y, text, color, amount)
 
-def buy_upgrade(uid):
-    u = state["upgrades"][uid]
+# ========================
+# RENDERER
+# ========================
+class Renderer:
+    def __init__(self, root, frame_ms=FRAME_MS):
+        """Coalesce UI refreshes: collect dirty render calls and run them at most once per frame."""
+        self.root = root
+        self.frame_ms = frame_ms
+        self.dirty = set()
+        self.pushed = {}  # (widget, option) -> last value sent to Tk
+        self.pending = None
+
+    def mark(self, render, *args):
+        """Schedule render(*args) for the next frame. Repeated marks within a frame are merged."""
+        self.dirty.add((render, *args))
+
+        if self.pending is None:
+            self.pending = self.root.after(self.frame_ms, self.flush)
+
+    def flush(self):
+        # anything marked while flushing (e.g. by a batch of queued clicks) is drawn in this same frame
+        self.pending = True
 
-    if u["purchased"] or not is_unlocked(u): return
+        try:
+            while self.dirty:
+                dirty, self.dirty = self.dirty, set()
 
-    if state["money"] >= u["cost"]:
-        state["money"] -= u["cost"]
+                for render, *args in dirty:
+                    render(*args)
+        finally:
+            # a render that raises must not stop every later frame from being scheduled
+            self.pending = None
 
-        if u["type"] == "click":
-            state["click_power"] *= u["mult"]
-        elif u["type"] == "producer":
-            state["producers"][u["target"]]["mult"] *= u["mult"]
+            if self.dirty:
+                self.pending = self.root.after(self.frame_ms, self.flush)
 
-        u["purchased"] = True
-        state["total_upgrades"] += 1
+    def set(self, widget, **options):
+        """Configure only the widget options whose value differs from what Tk already shows."""
+        changed = {}
 
-    check_achievements()
-    update_ui()
+        for name, value in options.items():
+            if self.pushed.get((widget, name)) != value:
+                self.pushed[(widget, name)] = value
+                changed[name] = value
+
+        if changed:
+            widget.config(**changed)
 
 # ========================
-# ANIMATIONS
+# IMAGE CACHE
 # ========================
-def floating_text(canvas, x, y, text, color="black"):
-    label = tk.Label(canvas, text=text, fg=color, bg="white", font=("Arial", 10, "bold"))
-    label.place(x=x, y=y)
+class ImageCache:
+    def __init__(self):
+        """Decode each image file once, on first use, and share the PhotoImage between every widget showing it."""
+        self.images = {}  # normalized path (or blank size) -> PhotoImage; also keeps Tk from freeing them
+        self.hits = 0
+
+    def get(self, path):
+        key = os.path.normpath(path)
+        image = self.images.get(key)
+
+        if image is None:
+            image = self.images[key] = tk.PhotoImage(file=key)
+        else:
+            self.hits += 1
+
+        return image
+
+    def blank(self, width=ICON_SIZE, height=ICON_SIZE):
+        """A shared empty image, used as a placeholder of the given size."""
+        key = ("blank", width, height)
 
-    def animate(i=0):
-        if i > 20: label.destroy(); return
-        label.place(x=x, y=y - i)
-        label.after(30, animate, i+1)
+        if key not in self.images:
+            self.images[key] = tk.PhotoImage(width=width, height=height)
 
-    animate()
+        return self.images[key]
+
+assets = ImageCache()
 
 # ========================
-# ACHIEVEMENTS
+# STARTUP TIMING
 # ========================
-def check_achievements():
-    achievements = [
-        ("First Brew", lambda: state["total_clicks"] >= 1),
-        ("Apprentice Barista", lambda: state["producers"]["barista"]["qty"] >= 10),
-        ("Bean Tycoon", lambda: state["cups"] >= 1000),
-        ("Upgrade Enthusiast", lambda: state["total_upgrades"] >= 3),
-    ]
-
-    for name, cond in achievements:
-        if cond() and name not in state["achievements"]:
-            state["achievements"].append(name)
-            floating_text(canvas, 60, 20, f"Achievement: {name}", color="green")
+def startup_phase(name):
+    """Record the time since the previous phase (or since the first import) as phase name."""
+    now = time.perf_counter()
+    start = STARTUP_T0 + sum(seconds for _, seconds in startup_phases)
+    startup_phases.append((name, now - start))
 
-    update_ui()
+def report_startup():
+    total = sum(seconds for _, seconds in startup_phases)
+    print("Startup: " + " | ".join(f"{name} {seconds * 1000:.1f} ms" for name, seconds in startup_phases) + f" | total {total * 1000:.1f} ms")
 
 # ========================
 # UI UPDATE
 # ========================
-def update_ui():
-    stats_label.config(
+def render_stats():
+    renderer.set(stats_label,
         text=f"Cups: {format_num(state['cups'])}   |   Profit: ${format_num(state['money'])}\n"
              f"Production: {get_total_production():.1f} cups/sec   |   Click Power: {state['click_power']}"
     )
 
-    # Producers
-    for pid, p in state["producers"].items():
-        cost = get_cost(p)
+def render_producer(pid):
+    p = state["producers"][pid]
+    amount = get_buy_amount()
+    n = max(engine.get_buy_amount(pid, amount), 1)
+    cost = get_bulk_cost(p, n)
+    qty_text = "" if amount == 1 else f" x{n}"
 
-        producer_widgets[pid]["label"].config(
-            text=f"{p['name']} (x{p['qty']})\nCost: ${format_num(cost)} | +{p['baseProd']*p['mult']}/sec"
-        )
+    renderer.set(producer_widgets[pid]["label"],
+        text=f"{p['name']} (x{p['qty']})\nCost{qty_text}: ${format_num(cost)} | +{p['baseProd']*p['mult']}/sec"
+    )
 
-    # Upgrades
-    for uid, u in state["upgrades"].items():
-        w = upgrade_widgets[uid]
+def render_upgrade(uid):
+    u = state["upgrades"][uid]
+    w = upgrade_widgets[uid]
 
-        if not is_unlocked(u):
-            w["label"].config(text="???")
-            w["button"].config(state="disabled")
-            continue
+    if not is_unlocked(uid):
+        renderer.set(w["label"], text="???")
+        renderer.set(w["button"], state="disabled", image=assets.blank())
+        return
 
-        if u["purchased"]:
-            w["label"].config(text=f"{u['name']} (BOUGHT)")
-            w["button"].config(state="disabled")
-        else:
-            w["label"].config(text=f"{u['name']} - Cost: ${format_num(u['cost'])}")
-            w["button"].config(state="normal")
+    # the icon is decoded the first time the upgrade is shown unlocked
+    renderer.set(w["button"], image=assets.get(u["icon"]))
+
+    if u["purchased"]:
+        renderer.set(w["label"], text=f"{u['name']} (BOUGHT)")
+        renderer.set(w["button"], state="disabled")
+    else:
+        renderer.set(w["label"], text=f"{u['name']} - Cost: ${format_num(u['cost'])}")
+        renderer.set(w["button"], state="normal")
 
-    # Stats & Achievements
-    stats_widgets["clicks"].config(text=f"Total Clicks: {state['total_clicks']}")
-    stats_widgets["upgrades"].config(text=f"Total Upgrades Bought: {state['total_upgrades']}")
-    stats_widgets["achievements"].config(
+def render_counters():
+    renderer.set(stats_widgets["clicks"], text=f"Total Clicks: {state['total_clicks']}")
+    renderer.set(stats_widgets["upgrades"], text=f"Total Upgrades Bought: {state['total_upgrades']}")
+    renderer.set(stats_widgets["achievements"],
         text="Achievements: " + (", ".join(state["achievements"]) if state["achievements"] else "None")
     )
 
+def mark_money():
+    """Mark everything that depends on cups/money."""
+    renderer.mark(render_stats)
+
+    if buy_mode.get() == BUY_MAX:
+        for pid in state["producers"]:
+            renderer.mark(render_producer, pid)
+
+def update_ui():
+    """Mark the whole UI for the next frame."""
+    renderer.mark(render_stats)
+    renderer.mark(render_counters)
+
+    for pid in state["producers"]:
+        renderer.mark(render_producer, pid)
+
+    for uid in state["upgrades"]:
+        renderer.mark(render_upgrade, uid)
+
 # ========================
 # GAME LOOP
 # ========================
 def game_loop():
-    prod = get_total_production() / 10
-    state["cups"] += prod
-    state["money"] += prod
+    steps = scheduler.advance()
 
-    check_achievements()
-    update_ui()
-    root.after(100, game_loop)
+    if steps:
+        engine.run(steps, scheduler.step)
+
+        if engine.production:
+            mark_money()
+
+    root.after(FRAME_MS, game_loop)
+
+# ========================
+# PERFORMANCE
+# ========================
+PERF_TIMERS = [("frame", "Frame"), ("tick", "Tick"), ("achievements", "Achievements"), ("ui", "UI"), ("floating", "Floating text"), ("save", "Save")]
+
+def enable_perf():
+    """Wrap the hot paths with perf timers. Only done with --perf; otherwise nothing is wrapped and nothing is timed."""
+    global game_loop, save_state
+
+    game_loop = perf.timed("frame", game_loop)
+    save_state = perf.timed("save", save_state)  # runs on the autosave thread
+    engine.run = perf.timed("tick", engine.run)
+    engine._metric_changed = perf.timed("achievements", engine._metric_changed)
+    renderer.flush = perf.timed("ui", renderer.flush)
+    floating._animate = perf.timed("floating", floating._animate)
+
+def pending_after_count():
+    """Number of Tk after callbacks currently scheduled."""
+    try:
+        return len(root.tk.splitlist(root.tk.call("after", "info")))
+    except tk.TclError:
+        return 0
+
+def perf_report():
+    """Everything the perf tab shows besides the timers, as JSON-friendly data."""
+    return {
+        "db_commit": db.commit_stats() if db is not None else None,
+        "pending_after": pending_after_count(),
+        "scheduler": scheduler.stats(),
+        "startup_ms": {name: seconds * 1000 for name, seconds in startup_phases},
+    }
+
+def render_perf():
+    report = perf_report()
+    timers = perf.summary()
+    lines = []
+
+    for name, title in PERF_TIMERS:
+        s = timers.get(name, {"count": 0})
+
+        if s["count"]:
+            lines.append(f"{title}: p50 {s['p50_ms']:.2f}  p95 {s['p95_ms']:.2f}  p99 {s['p99_ms']:.2f}  max {s['max_ms']:.2f} ms  (n={s['count']})")
+        else:
+            lines.append(f"{title}: -")
+
+    if report["db_commit"]:
+        c = report["db_commit"]
+        lines.append(f"DB commit: mean {c['mean_ms']:.2f}  p95 {c['p95_ms']:.2f}  max {c['max_ms']:.2f} ms  (n={c['count']})")
+
+    lines.append(f"Pending after callbacks: {report['pending_after']}   |   Sim backlog: {report['scheduler']['backlog_ms']:.1f} ms")
+    renderer.set(stats_widgets["perf"], text="\n".join(lines))
+
+def refresh_perf():
+    renderer.mark(render_perf)
+    root.after(PERF_REFRESH_MS, refresh_perf)
+
+def export_perf(path=None):
+    path = path or perf_path
+    perf.export(path, **perf_report())
+    print(f"Performance data written to {path}")
 
 # ========================
 # UI SETUP
@@ -243,11 +483,13 @@ def setup_canvas(root):
     canvas.pack(pady=5)
     return canvas
 
-def setup_brew_button(canvas, images, brew_click):
-    images["brew"] = tk.PhotoImage(file="cup.png")
-    brew_btn = tk.Button(canvas, image=images["brew"], command=brew_click, borderwidth=0, highlightthickness=0, bg="white", activebackground="white")
-    canvas.create_window(60, 50, window=brew_btn)
-    ToolTip(brew_btn, "Brew Coffee")
+def setup_brew_button(canvas, assets, brew_click):
+    # drawn as a canvas item rather than an embedded Button so floating text can render on top of it
+    brew_btn = canvas.create_image(60, 50, image=assets.get("cup.png"))
+    canvas.tag_bind(brew_btn, "<Button-1>", lambda event: brew_click())
+    canvas.tag_bind(brew_btn, "<Enter>", lambda event: canvas.config(cursor="hand2"), add="+")
+    canvas.tag_bind(brew_btn, "<Leave>", lambda event: canvas.config(cursor=""), add="+")
+    ToolTip(canvas, "Brew Coffee", item=brew_btn)
 
     return brew_btn
 
@@ -257,15 +499,24 @@ def setup_notebook(root):
 
     return notebook
 
-def setup_producers_tab(notebook, images, producer_widgets, state, buy_producer):
+def setup_producers_tab(notebook, assets, producer_widgets, state, buy_producer):
+    global buy_mode
+
     producers_tab = ttk.Frame(notebook)
     notebook.add(producers_tab, text="Producers")
 
+    buy_mode = tk.StringVar(value="1")
+    mode_frame = tk.Frame(producers_tab)
+    mode_frame.pack(fill="x", pady=2)
+    tk.Label(mode_frame, text="Buy:").pack(side="left")
+
+    for text, value in BUY_AMOUNTS:
+        tk.Radiobutton(mode_frame, text=text, value=value, variable=buy_mode, indicatoron=False, command=update_ui).pack(side="left", padx=1)
+
     for pid, p in state["producers"].items():
         frame = tk.Frame(producers_tab)
         frame.pack(fill="x", pady=2)
-        images[pid] = tk.PhotoImage(file=p["icon"])
-        btn = tk.Button(frame, image=images[pid], command=lambda pid=pid: buy_producer(pid))
+        btn = tk.Button(frame, image=assets.get(p["icon"]), command=lambda pid=pid: buy_producer(pid))
         btn.pack(side="left")
         label = tk.Label(frame, text="", anchor="w", justify="left")
         label.pack(side="left", padx=5)
@@ -273,15 +524,15 @@ def setup_producers_tab(notebook, images, producer_widgets, state, buy_producer)
 
     return producers_tab
 
-def setup_upgrades_tab(notebook, images, upgrade_widgets, state, buy_upgrade):
+def setup_upgrades_tab(notebook, assets, upgrade_widgets, state, buy_upgrade):
     upgrades_tab = ttk.Frame(notebook)
     notebook.add(upgrades_tab, text="Upgrades")
 
     for uid, u in state["upgrades"].items():
         frame = tk.Frame(upgrades_tab)
         frame.pack(fill="x", pady=2)
-        images[uid] = tk.PhotoImage(file=u["icon"])
-        btn = tk.Button(frame, image=images[uid], command=lambda uid=uid: buy_upgrade(uid))
+        # icons of locked upgrades are loaded by render_upgrade once they unlock
+        btn = tk.Button(frame, image=assets.blank(), command=lambda uid=uid: buy_upgrade(uid))
         btn.pack(side="left")
         label = tk.Label(frame, text="???", anchor="w", justify="left")
         label.pack(side="left", padx=5)
@@ -302,134 +553,245 @@ def setup_stats_tab(notebook, stats_widgets):
     
     return stats_tab
 
+def setup_perf_tab(notebook, stats_widgets):
+    perf_tab = ttk.Frame(notebook)
+    notebook.add(perf_tab, text="Performance")
+    stats_widgets["perf"] = tk.Label(perf_tab, text="", anchor="w", justify="left", font=("Courier", 9))
+    stats_widgets["perf"].pack(fill="x", pady=2)
+    tk.Button(perf_tab, text="Export", command=export_perf).pack(anchor="w", pady=2)
+
+    return perf_tab
+
 # ========================
 # SAVE/LOAD STATE
 # ========================
 
-def save_state():
+def take_snapshot():
+    state["last_saved"] = time.time()
+
+    if journal is not None:
+        journal.snapshot()
+
+    # the DB stores producer/upgrade rows individually, so only the changed ones are passed on
+    return engine.progress(changed_only=db is not None)
+
+def merge_snapshots(older, newer):
+    """Combine two delta snapshots waiting in the autosave queue: newer values win, older rows are kept."""
+    merged = dict(newer)
+    merged["producers"] = {**older["producers"], **newer["producers"]}
+    merged["upgrades"] = {**older["upgrades"], **newer["upgrades"]}
+    return merged
+
+def save_state(snapshot=None):
+    if snapshot is None:
+        snapshot = take_snapshot()
+
     if db is not None:
-        save_db_state()
-    else:
-        save_file_state()
-
-def save_db_state():
-    # first time we are saving, insert into db
-    if db is not None and db.read(1) is None:
-        db.create(
-            {
-                "cups": state["cups"],
-                "money": state["money"],
-                "click_power": state["click_power"],
-                "total_clicks": state["total_clicks"],
-                "total_upgrades": state["total_upgrades"],
-                "achievements": ", ".join(state["achievements"]),
-                "producers": json.dumps(state["producers"]),
-                "upgrades": json.dumps(state["upgrades"])
-            }
-        )
-    elif db is not None:
-        db.update(
-            {
-                "id": 1,
-                "cups": state["cups"],
-                "money": state["money"],
-                "click_power": state["click_power"],
-                "total_clicks": state["total_clicks"],
-                "total_upgrades": state["total_upgrades"],
-                "achievements": ", ".join(state["achievements"]),
-                "producers": json.dumps(state["producers"]),
-                "upgrades": json.dumps(state["upgrades"])
-            }
-        )
+        save_db_state(snapshot)
     else:
+        save_file_state(snapshot)
+
+def save_db_state(snapshot):
+    if db is None: raise
+
+    try:
+        write_db_state(snapshot)
+    except Exception:
+        # the rows were taken out of the engine's change set; hand them back for the next save
+        # (mark_changed is locked against progress() on the Tk thread)
+        engine.mark_changed(snapshot["producers"], snapshot["upgrades"])
         raise
 
-def save_file_state():
+def write_db_state(snapshot):
+    db.save_game(
+        {
+            "id": save_id,
+            "cups": clamp_real(snapshot["cups"]),
+            "money": clamp_real(snapshot["money"]),
+            "big": big_values(snapshot),
+            "click_power": snapshot["click_power"],
+            "total_clicks": snapshot["total_clicks"],
+            "total_upgrades": snapshot["total_upgrades"],
+            "achievements": ", ".join(snapshot["achievements"]),
+            "last_saved": snapshot["last_saved"]
+        },
+        snapshot["producers"],
+        snapshot["upgrades"]
+    )
+
+def save_file_state(snapshot):
     try:
-        with open(STATE_FILE, "w") as f:
-            json.dump(state, f)
+        write_save(STATE_FILE, snapshot)
     except Exception as e:
         print(f"Error saving state: {e}")
 
+def autosave():
+    autosaver.submit(take_snapshot())
+    root.after(AUTOSAVE_MS, autosave)
+
+def flush_journal():
+    journal_writer.submit(None)
+    root.after(JOURNAL_FLUSH_MS, flush_journal)
+
 def load_state(use_db):
     if use_db:
         load_db_state()
     else:
         load_file_state()
 
+    engine.rebuild()
+
 def load_db_state():
-    record = db.read(1) if db is not None else None
+    record = db.read(save_id) if db is not None else None
 
     if record:
         state["cups"] = record[1]
         state["money"] = record[2]
+
+        # values past the float range are stored exactly as BigNum strings
+        for key, value in json.loads(record[11] or "{}").items():
+            state[key] = from_plain(value)
+
         state["click_power"] = record[3]
         state["total_clicks"] = record[4]
         state["total_upgrades"] = record[5]
         state["achievements"] = record[6].split(", ") if record[6] else []
 
-        try:
-            state["producers"] = json.loads(record[7])
-        except json.JSONDecodeError:
-            state["producers"] = {}
-            
-        try:
-            state["upgrades"] = json.loads(record[8])
-        except json.JSONDecodeError:
-            state["upgrades"] = {}
+        state["last_saved"] = record[9] or 0.0
+
+        # merge saved progress onto the built-in definitions; ids no longer in the game are ignored
+        for pid, (qty, mult) in db.read_producers(save_id).items():
+            if pid in state["producers"]:
+                state["producers"][pid].update(qty=qty, mult=mult)
+
+        for uid, (purchased, unlocked) in db.read_upgrades(save_id).items():
+            if uid in state["upgrades"]:
+                state["upgrades"][uid].update(purchased=purchased, unlocked=unlocked)
 
 def load_file_state():
-    if os.path.exists(STATE_FILE):
-        try:
-            with open(STATE_FILE, "r") as f:
-                loaded = json.load(f)
+    try:
+        progress = read_save(STATE_FILE) or read_save(LEGACY_STATE_FILE)
 
-            # Only update keys that exist in the default state
-            for k in state:
-                if k in loaded:
-                    state[k] = loaded[k]
-        except Exception as e:
-            print(f"Error loading state: {e}")
+        # merged onto the built-in definitions; only progress is stored
+        if progress:
+            engine.restore(progress)
+    except Exception as e:
+        print(f"Error loading state: {e}")
 
 def on_close():
-    save_state()
+    autosaver.submit(take_snapshot())
+    autosaver.stop()
+
+    if journal is not None:
+        journal_writer.submit(None)
+        journal_writer.stop()
+
+    if perf is not None:
+        export_perf()
+
     root.destroy()
 
 # ========================
 # MAIN
 # ========================
-def main(use_db=True):
-    global root, stats_label, canvas, db
+def main(use_db=True, slot=DEFAULT_SLOT, perf_out=None):
+    """Start the game. With perf_out, hot paths are timed, a Performance tab is shown and the data is written to perf_out on exit."""
+    global root, stats_label, canvas, db, renderer, floating, scheduler, autosaver, journal, journal_writer, save_id, perf, perf_path
 
     db = None
+    startup_phase("imports")
 
     if use_db:
-        db = DatabaseManager()
+        # written only from the autosave thread once the game is running
+        db = DatabaseManager(check_same_thread=False, wal=True)
+        save_id = db.open_slot(slot)
+        startup_phase("db open")
 
     load_state(use_db)
 
+    if use_db:
+        # replay anything recorded after the last save (e.g. after a crash), then keep recording
+        journal = Journal(save_id=save_id, keep_snapshots=JOURNAL_KEEP_SNAPSHOTS)
+        journal.recover(engine)
+        journal.attach(engine)
+        journal.snapshot(session_start=True)
+
+    _, offline_earned = engine.catch_up(state["last_saved"])
+    engine.add_listener(on_engine_event)
+    startup_phase("state load")
+
     root = setup_root()
     root.protocol("WM_DELETE_WINDOW", on_close)
+    renderer = Renderer(root)
 
     stats_label = setup_stats_label(root)
 
     canvas = setup_canvas(root)
 
-    setup_brew_button(canvas, images, brew_click)
+    setup_brew_button(canvas, assets, brew_click)
+    floating = FloatingTextPool(canvas)
     notebook = setup_notebook(root)
 
-    setup_producers_tab(notebook, images, producer_widgets, state, buy_producer)
-    setup_upgrades_tab(notebook, images, upgrade_widgets, state, buy_upgrade)
+    setup_producers_tab(notebook, assets, producer_widgets, state, buy_producer)
+    setup_upgrades_tab(notebook, assets, upgrade_widgets, state, buy_upgrade)
     setup_stats_tab(notebook, stats_widgets)
 
+    if perf_out:
+        perf, perf_path = PerfRecorder(), perf_out
+        setup_perf_tab(notebook, stats_widgets)
+
+    startup_phase("widget build")
+
+    # draw the first frame now rather than one frame interval later, so it can be timed
     update_ui()
+    renderer.flush()
+    root.update_idletasks()
+    startup_phase("first frame")
+    report_startup()
+
+    if offline_earned > 0:
+        floating_text(60, 60, f"Welcome back! +{format_num(offline_earned)}", color="darkblue")
+
+    scheduler = FixedStepScheduler(rate=SIM_RATE, interval=FRAME_MS / 1000)
+    scheduler.start()
+
+    if perf is not None:
+        enable_perf()
+        refresh_perf()
 
     game_loop()
 
+    autosaver = AutoSaver(save_state, merge_snapshots)
+    root.after(AUTOSAVE_MS, autosave)
+
+    if journal is not None:
+        journal_writer = AutoSaver(journal.flush)
+        root.after(JOURNAL_FLUSH_MS, flush_journal)
+
     root.mainloop()
 
 # ========================
 # START
 # ========================
+def list_slots(n=10):
+    db = DatabaseManager()
+
+    print("Recently played:")
+    for row in db.recent_saves(n):
+        print(f"  {row[10]:<20} cups {format_num(row[1]):>8}   money ${format_num(row[2]):>8}")
+
+    print("Top by money:")
+    for row in db.top_saves("money", n):
+        print(f"  {row[10]:<20} money ${format_num(row[2]):>8}")
+
 if __name__ == "__main__":
-    main()
+    parser = argparse.ArgumentParser(description="Coffee Empire idle game.")
+    parser.add_argument("--slot", default=DEFAULT_SLOT, help="name of the save slot to play")
+    parser.add_argument("--list-slots", action="store_true", help="print recent and top save slots and exit")
+    parser.add_argument("--perf", nargs="?", const="perf.json", metavar="PATH", help="time hot paths, show a Performance tab and write the data to PATH on exit (default perf.json)")
+    args = parser.parse_args()
+
+    if args.list_slots:
+        list_slots()
+    else:
+        main(slot=args.slot, perf_out=args.perf)
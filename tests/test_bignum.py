@@ -0,0 +1,64 @@
+"""BigNum arithmetic and ordering. Run with: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from BigNum import BigNum, promote
+
+class BigNumTest(unittest.TestCase):
+    def assertClose(self, a, b):
+        self.assertAlmostEqual(a.m, b.m, places=12)
+        self.assertEqual(a.e, b.e)
+
+    def test_normalises(self):
+        n = BigNum(1234.5, 2)
+        self.assertAlmostEqual(n.m, 1.2345)
+        self.assertEqual(n.e, 5)
+        self.assertEqual((BigNum(0, 7).m, BigNum(0, 7).e), (0.0, 0))
+
+    def test_add(self):
+        self.assertClose(BigNum(5, 300) + BigNum(5, 300), BigNum(1, 301))
+        self.assertClose(BigNum(1, 400) + 1.0, BigNum(1, 400))  # below precision
+        self.assertClose(2 + BigNum(3), BigNum(5))
+
+    def test_sub(self):
+        self.assertClose(BigNum(1, 301) - BigNum(5, 300), BigNum(5, 300))
+        self.assertClose(BigNum(3) - 5, BigNum(-2))
+        self.assertFalse(BigNum(7, 350) - BigNum(7, 350))
+
+    def test_compare(self):
+        self.assertLess(BigNum(1, 300), BigNum(2, 300))
+        self.assertLess(BigNum(9, 300), BigNum(1, 301))
+        self.assertLess(BigNum(-5, 3), BigNum(-4, 3))
+        self.assertLess(BigNum(-1, 301), BigNum(-9, 300))
+        self.assertLess(BigNum(-1), 0)
+        self.assertGreater(BigNum(1, 400), 1e300)
+        self.assertEqual(BigNum(5), 5.0)
+
+    def test_sort(self):
+        values = [BigNum(-5, 3), BigNum(2, 1), BigNum(-4, 3), BigNum(0), BigNum(-6, 3), BigNum(1, 400), BigNum(-1, 2)]
+        self.assertEqual([float(v) for v in sorted(values)], [-6000, -5000, -4000, -100, 0, 20, float("inf")])
+
+    def test_hash_matches_float(self):
+        self.assertEqual(hash(BigNum(5)), hash(5.0))
+        self.assertEqual(len({BigNum(5), 5.0, BigNum(1, 400), BigNum(1, 400)}), 2)
+
+    def test_pow(self):
+        self.assertClose(BigNum(2) ** 10, BigNum(1.024, 3))
+        self.assertClose(BigNum(1, 200) ** 3, BigNum(1, 600))
+        self.assertFalse(BigNum(0) ** 5)
+
+    def test_parse(self):
+        for n in (BigNum(1.5, 400), BigNum(-2.25, 12), BigNum(0)):
+            self.assertClose(BigNum.parse(str(n)), n)
+
+        self.assertClose(BigNum.parse("42"), BigNum(4.2, 1))
+
+    def test_promote(self):
+        self.assertIs(type(promote(1e299)), float)
+        self.assertIs(type(promote(1e300)), BigNum)
+
+if __name__ == "__main__":
+    unittest.main()
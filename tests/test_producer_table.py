@@ -0,0 +1,59 @@
+"""ProducerTable's column math against the per-row cost functions. Run with: python -m unittest discover tests"""
+import os
+import sys
+import unittest
+
+sys.path.insert(0, os.path.join(os.path.dirname(os.path.abspath(__file__)), ".."))
+
+from BigNum import BigNum
+from GameEngine import GameEngine, get_bulk_cost, get_cost, get_max_affordable
+from ProducerTable import ProducerTable
+
+def producers(*quantities):
+    """Copies of the built-in producers, with the given quantities."""
+    rows = {pid: dict(p) for pid, p in GameEngine().state["producers"].items()}
+
+    for p, qty in zip(rows.values(), quantities):
+        p["qty"] = qty
+
+    return rows
+
+class ProducerTableTest(unittest.TestCase):
+    def assertRows(self, got, expected):
+        self.assertEqual(len(got), len(expected))
+
+        for a, b in zip(got, expected):
+            self.assertEqual(a, b)
+
+    def test_float_range_matches_rows(self):
+        rows = producers(0, 5, 17, 40, 3, 80)
+        table = ProducerTable(rows)
+
+        self.assertRows(table.next_costs(), [get_cost(p) for p in rows.values()])
+
+        for n in (0, 1, 10, 25):
+            self.assertRows(table.bulk_costs(n), [get_bulk_cost(p, n) for p in rows.values()])
+
+        for money in (0, 38, 1e4, 1e9):
+            self.assertRows(table.max_affordable(money), [get_max_affordable(p, money) for p in rows.values()])
+
+    def test_bignum_money(self):
+        rows = producers(0, 5, 17, 40, 3, 80)
+        money = BigNum(1, 400)
+        counts = ProducerTable(rows).max_affordable(money)
+
+        self.assertRows(counts, [get_max_affordable(p, money) for p in rows.values()])
+        self.assertTrue(all(n > 0 for n in counts))
+
+    def test_costs_past_float_range(self):
+        rows = producers(6000, 5)
+        table = ProducerTable(rows)
+
+        costs = table.next_costs()
+        self.assertIsInstance(costs[0], BigNum)
+        self.assertRows(costs, [get_cost(p) for p in rows.values()])
+        self.assertRows(table.bulk_costs(10), [get_bulk_cost(p, 10) for p in rows.values()])
+        self.assertRows(table.max_affordable(1e9), [get_max_affordable(p, 1e9) for p in rows.values()])
+
+if __name__ == "__main__":
+    unittest.main()